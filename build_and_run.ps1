@@ -42,8 +42,11 @@ if (-not (pip show pyinstaller)) {
 }
 
 # Step 2: Build the .exe with all data included
-# Collect all files in src/bin and config files
+# Precompile the reference pack so the bundled app starts without preprocessing
 $binDir = Join-Path $srcDir 'bin'
+python (Join-Path $srcDir 'tools\build_reference_pack.py')
+
+# Collect all files in src/bin and config files
 $binFiles = Get-ChildItem -Path $binDir -File | ForEach-Object { "--add-data=$($binDir)\$($_.Name);bin" }
 $configFile = Join-Path $projectRoot 'config.json'
 $configFiles = @("--add-data=$configFile;.")
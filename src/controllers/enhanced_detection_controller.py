@@ -6,6 +6,7 @@ Enhanced detection controller with debug output on first run
 import threading
 import time
 from typing import Callable, Optional
+from models.temporal_voter import TemporalVoter
 
 class EnhancedDetectionController:
     """Enhanced controller with debug output for first screenshot"""
@@ -19,6 +20,11 @@ class EnhancedDetectionController:
         self.is_running = False
         self.match_found = False
         self.detection_thread = None
+        self.voter = TemporalVoter(
+            config_model.temporal_voting_window,
+            config_model.temporal_voting_required,
+            config_model.temporal_voting_release_margin,
+        )
         self.first_run = True
 
         self.on_match_found = None
@@ -30,6 +36,8 @@ class EnhancedDetectionController:
         if not self.is_running:
             self.is_running = True
             self.match_found = False
+            self.detection_model.frame_gate.reset()
+            self.voter.reset()
             self.detection_thread = threading.Thread(
                 target=self._detection_loop, daemon=True
             )
@@ -63,18 +71,15 @@ class EnhancedDetectionController:
                 img = self.screenshot_model.capture_monitor_screenshot(monitor_index, show_debug=show_debug)
                 
                 if img is not None:
-                    highest_match, highest_score = self.detection_model.detect_match_in_image_with_score(img)
+                    # Popup geometry follows the client window inside the captured monitor
+                    self.detection_model.update_client_rect(self.screenshot_model.latest_monitor)
+                    highest_match, highest_score = self._vote(*self._detect(img))
 
-                    if highest_match == "ad":
+                    if self.detection_model.get_reference_action(highest_match) == "ad_detected":
                         self.is_running = False
                         break
 
-                    if highest_match in [
-                        "dota",
-                        "dota2_plus",
-                        "read_check",
-                        "ad",
-                    ]:
+                    if highest_match != "none":
                         action = self.detection_model.process_detection_result(
                             highest_match
                         )
@@ -99,13 +104,32 @@ class EnhancedDetectionController:
                 else:
                     pass
 
-                time.sleep(1)
+                time.sleep(self.config_model.detection_interval)
 
         except Exception as e:
             pass
         finally:
             pass
 
+    def _detect(self, img):
+        """
+        Run the detector cascade on a frame
+        Returns (highest_match, highest_score, per-reference scores)
+        """
+        highest_match, highest_score = self.detection_model.detect_match_in_image_with_score(img)
+        return highest_match, highest_score, dict(self.detection_model.last_scores)
+
+    def _vote(self, highest_match, highest_score, scores):
+        """Act only on matches confirmed over several ticks"""
+        if not self.config_model.temporal_voting_enabled:
+            return highest_match, highest_score
+        self.voter.configure(
+            self.config_model.temporal_voting_window,
+            self.config_model.temporal_voting_required,
+            self.config_model.temporal_voting_release_margin,
+        )
+        return self.voter.update(scores, self.detection_model.threshold_for)
+
     def get_status(self) -> dict:
         """Get current detection status"""
         return {
@@ -13,8 +13,10 @@ from models.config_model import ConfigModel
 from models.audio_model import AudioModel
 from models.screenshot_model import ScreenshotModel
 from models.detection_model import DetectionModel
+from models.window_model import WindowModel
 from views.main_view import MainView
 from controllers.detection_controller import DetectionController
+from controllers.process_detection_controller import ProcessDetectionController
 
 
 class MainController:
@@ -25,9 +27,18 @@ class MainController:
         self.config_model = ConfigModel()
         self.audio_model = AudioModel()
         self.screenshot_model = ScreenshotModel()
-        self.detection_model = DetectionModel(config_model=self.config_model)
 
-        self.detection_controller = DetectionController(
+        # Optionally keep capture and detection out of the GUI interpreter; the
+        # worker then builds the only DetectionModel and the GUI keeps the window helpers
+        if self.config_model.detection_worker_process:
+            self.detection_model = None
+            self.window_model = WindowModel(self.config_model)
+            detection_controller_class = ProcessDetectionController
+        else:
+            self.detection_model = DetectionModel(config_model=self.config_model)
+            self.window_model = self.detection_model.window_model
+            detection_controller_class = DetectionController
+        self.detection_controller = detection_controller_class(
             self.detection_model,
             self.screenshot_model,
             self.audio_model,
@@ -177,7 +188,10 @@ class MainController:
 
     def _update_screenshot_preview(self):
         """Update screenshot preview in UI"""
-        img, timestamp = self.screenshot_model.get_latest_screenshot()
+        if hasattr(self.detection_controller, 'get_latest_screenshot'):
+            img, timestamp = self.detection_controller.get_latest_screenshot()
+        else:
+            img, timestamp = self.screenshot_model.get_latest_screenshot()
         self.view.update_screenshot(img, timestamp)
 
         self.view.after(1000, self._update_screenshot_preview)
@@ -266,7 +280,12 @@ class MainController:
 
     def _on_score_threshold_change(self, threshold: float):
         """Handle score threshold change"""
-        self.detection_model.set_score_threshold(threshold)
+        if self.detection_model is not None:
+            self.detection_model.set_score_threshold(threshold)
+        else:
+            self.config_model.detection_threshold = threshold
+        if hasattr(self.detection_controller, 'set_score_threshold'):
+            self.detection_controller.set_score_threshold(threshold)
 
     def _on_telegram_enabled_change(self, enabled: bool):
         self.config_model.telegram_enabled = enabled
@@ -481,6 +500,10 @@ class MainController:
     def _on_closing(self):
         """Handle application closing"""
         self.detection_controller.stop_detection()
+        if hasattr(self.detection_controller, 'shutdown'):
+            self.detection_controller.shutdown()
+        if self.detection_model is not None:
+            self.detection_model.shutdown_scoring_pool()
         self._send_telegram_event("closing", "👋 App Closing — Dota 2 Auto Accept is shutting down.")
 
     def _on_match_found(self):
@@ -503,7 +526,7 @@ class MainController:
     def debug_dota2_windows(self):
         """Debug method to get information about Dota 2 windows"""
         try:
-            debug_info = self.detection_model.get_dota2_window_debug_info()
+            debug_info = self.window_model.get_debug_info()
             self.logger.info("=== Dota 2 Window Debug Information ===")
             self.logger.info(f"Processes found: {len(debug_info['processes'])}")
             for proc in debug_info['processes']:
@@ -521,7 +544,7 @@ class MainController:
     def force_focus_dota2(self):
         """Manually trigger Dota 2 window focusing"""
         try:
-            success = self.detection_model.focus_dota2_window_enhanced()
+            success = self.window_model.focus_dota2_window_enhanced()
             if success:
                 self.view.show_info("Window Focus", "Successfully focused Dota 2 window")
             else:
@@ -0,0 +1,178 @@
+import datetime
+import logging
+import multiprocessing
+import queue
+import threading
+import mss
+from models.detection_worker import SharedFrameBuffer, run_detection_worker
+
+
+class ProcessDetectionController:
+    """Controller that runs capture and detection in a separate worker process
+
+    Detection no longer competes with Tk/CustomTkinter redraws for the GIL.
+    Frames come back through a shared-memory buffer and results as small
+    messages, which are dispatched to the same callbacks as DetectionController.
+    """
+
+    def __init__(self, detection_model, screenshot_model, audio_model, config_model):
+        self.logger = logging.getLogger("Dota2AutoAccept.ProcessDetectionController")
+        self.detection_model = detection_model  # None; the worker builds its own
+        self.screenshot_model = screenshot_model
+        self.audio_model = audio_model
+        self.config_model = config_model
+
+        self.is_running = False
+        self.match_found = False
+        self.worker = None
+        self.listener_thread = None
+        self._context = multiprocessing.get_context("spawn")
+        self._results = None
+        self._commands = None
+        self._stop_event = None
+        self._frames = None
+        self._latest_frame = None  # (slot, size, sequence, timestamp)
+
+        self.on_match_found = None
+        self.on_detection_update = None
+        self.on_start_failed = None
+        # The worker keeps its own ConfigModel; GUI changes are saved first, then reloaded
+        config_model.add_listener(self._on_config_changed)
+
+    def _frame_capacity(self) -> int:
+        """Bytes needed for one RGB frame of the largest monitor"""
+        try:
+            with mss.mss() as sct:
+                return max(m["width"] * m["height"] * 3 for m in sct.monitors[1:])
+        except Exception:
+            return 3840 * 2160 * 3
+
+    def start_detection(self):
+        """Start the detection worker process"""
+        if self.is_running:
+            if callable(self.on_start_failed):
+                self.on_start_failed("Detection is already running.")
+            return False
+
+        self._release_frames()
+        self._frames = SharedFrameBuffer(self._frame_capacity(), create=True)
+        self._results = self._context.Queue()
+        self._commands = self._context.Queue()
+        self._stop_event = self._context.Event()
+        self.worker = self._context.Process(
+            target=run_detection_worker,
+            args=(
+                self.config_model.config_file,
+                self._frames.name,
+                self._frames.capacity,
+                self._results,
+                self._commands,
+                self._stop_event,
+            ),
+            daemon=True,
+            name="DetectionWorker",
+        )
+        self.is_running = True
+        self.match_found = False
+        self.worker.start()
+        self.listener_thread = threading.Thread(
+            target=self._listen, args=(self._results,), daemon=True
+        )
+        self.listener_thread.start()
+        return True
+
+    def stop_detection(self):
+        """Ask the worker process to stop"""
+        if self.is_running:
+            self.is_running = False
+            if self._stop_event is not None:
+                self._stop_event.set()
+            return True
+        return False
+
+    def shutdown(self):
+        """Stop the worker and release the shared frame buffer"""
+        self.stop_detection()
+        if self.worker is not None:
+            self.worker.join(timeout=3)
+            if self.worker.is_alive():
+                self.worker.terminate()
+        self._release_frames()
+
+    def _release_frames(self):
+        if self._frames is not None:
+            self._frames.close()
+            self._frames.unlink()
+            self._frames = None
+            self._latest_frame = None
+
+    def set_score_threshold(self, threshold: float):
+        """Forward a threshold change to the worker process"""
+        if self._commands is not None:
+            self._commands.put({"type": "threshold", "value": float(threshold)})
+
+    def _on_config_changed(self, key, value):
+        """Ask the worker to reload config.json after the GUI changed a setting"""
+        if self._commands is not None and self.is_running:
+            self._commands.put({"type": "reload_config"})
+
+    def _listen(self, results):
+        """Dispatch worker messages to the controller callbacks"""
+        while True:
+            try:
+                message = results.get(timeout=0.5)
+            except queue.Empty:
+                if self.worker is None or not self.worker.is_alive():
+                    break
+                continue
+
+            kind = message.get("type")
+            if kind == "update":
+                if message["slot"] is not None:
+                    self._latest_frame = (
+                        message["slot"],
+                        tuple(message["size"]),
+                        message["sequence"],
+                        datetime.datetime.fromtimestamp(message["timestamp"]),
+                    )
+                if self.on_detection_update:
+                    self.on_detection_update(None, message["match"], message["score"])
+            elif kind == "match_found":
+                self.audio_model.play_alert_sound(
+                    self.config_model.selected_device_id,
+                    self.config_model.alert_volume,
+                )
+                self.match_found = True
+                if self.on_match_found:
+                    self.on_match_found()
+            elif kind == "stopped":
+                break
+        # A newer worker may already be running after a quick stop/start
+        if results is self._results:
+            self.is_running = False
+
+    def get_latest_screenshot(self):
+        """Latest frame captured by the worker and its timestamp"""
+        # A slot rewritten during the copy is retried once with the newer frame
+        for _ in range(2):
+            latest = self._latest_frame
+            frames = self._frames
+            if latest is None or frames is None:
+                return None, None
+            slot, size, sequence, timestamp = latest
+            try:
+                img = frames.read(slot, size, sequence)
+            except Exception as e:
+                self.logger.debug(f"Could not read shared frame: {e}")
+                return None, None
+            if img is not None:
+                return img, timestamp
+        return None, None
+
+    def get_status(self) -> dict:
+        """Get current detection status"""
+        return {
+            "is_running": self.is_running,
+            "match_found": self.match_found,
+            "thread_alive": self.worker.is_alive() if self.worker else False,
+        }
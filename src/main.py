@@ -6,6 +6,7 @@ MVC Architecture Implementation
 
 import sys
 import os
+import multiprocessing
 
 # Add the src directory to the Python path so we can import our modules
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
@@ -28,4 +29,6 @@ def main():
         traceback.print_exc()
 
 if __name__ == "__main__":
+    # Required for the detection worker process in PyInstaller builds
+    multiprocessing.freeze_support()
     main()
@@ -0,0 +1,74 @@
+import cv2
+import numpy as np
+from typing import Dict, Tuple
+
+
+class ChamferMatcher:
+    """Edge-map chamfer matching of the popup region at a reduced scale
+
+    Edges keep the popup's outline and text while ignoring the animated
+    background's colours and the client's lighting. Each side's edge pixels
+    are looked up in the other side's distance transform, truncated at
+    `max_distance` pixels; the larger of the two mean (chamfer) distances is
+    mapped to a score in [0, 1], where 1 means every edge lies on an edge of
+    the other image.
+    """
+
+    def __init__(
+        self,
+        reference_cache,
+        low_threshold: int = 50,
+        high_threshold: int = 150,
+        max_distance: float = 3.0,
+    ):
+        self.reference_cache = reference_cache
+        self.low_threshold = low_threshold
+        self.high_threshold = high_threshold
+        self.max_distance = max_distance
+        self._references: Dict[tuple, tuple] = {}
+
+    def edge_maps(self, gray: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Boolean edge map and truncated distance transform of a grayscale image"""
+        # Stretching the contrast first keeps edge strength independent of brightness
+        gray = cv2.normalize(gray, None, 0, 255, cv2.NORM_MINMAX)
+        edges = cv2.Canny(gray, self.low_threshold, self.high_threshold) > 0
+        distance = cv2.distanceTransform(
+            np.where(edges, 0, 255).astype(np.uint8), cv2.DIST_L2, 3
+        )
+        np.minimum(distance, self.max_distance, out=distance)
+        return edges, distance
+
+    def _get_reference(self, ref_path: str, roi, size: Tuple[int, int]):
+        """Edge map and distance transform of a reference prepared at `size`"""
+        key = (ref_path, roi, tuple(size))
+        prepared = self._references.get(key)
+        if prepared is not None:
+            return prepared
+        gray = self.reference_cache.get_array(ref_path, size, "L", roi)
+        if gray is None:
+            return None
+        prepared = self.edge_maps(np.ascontiguousarray(gray[:, :, 0]))
+        if len(self._references) > 64:
+            self._references.clear()
+        self._references[key] = prepared
+        return prepared
+
+    def score(self, frame_maps: Tuple[np.ndarray, np.ndarray], ref_path: str, roi) -> float:
+        """Similarity of a prepared frame region (edges, distance) to one reference"""
+        frame_edges, frame_distance = frame_maps
+        size = (frame_edges.shape[1], frame_edges.shape[0])
+        reference = self._get_reference(ref_path, roi, size)
+        if reference is None:
+            return 0.0
+        ref_edges, ref_distance = reference
+        if not frame_edges.any() or not ref_edges.any():
+            return 0.0
+        # The worse direction counts, so edge-dense clutter can not cover a template
+        distance = max(
+            float(frame_distance[ref_edges].mean()), float(ref_distance[frame_edges].mean())
+        )
+        return max(0.0, 1.0 - distance / self.max_distance)
+
+    def clear(self) -> None:
+        """Drop every prepared reference"""
+        self._references.clear()
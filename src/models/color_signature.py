@@ -0,0 +1,32 @@
+import numpy as np
+from PIL import Image
+from typing import NamedTuple, Tuple
+from models.reference_cache import roi_to_box
+
+
+class ColorSignature(NamedTuple):
+    """Pixels of a known colour expected in a small region, e.g. the accept button"""
+
+    roi: Tuple[float, float, float, float]  # Normalized (x, y, width, height)
+    lower: Tuple[int, int, int]  # Inclusive RGB lower bound
+    upper: Tuple[int, int, int]  # Inclusive RGB upper bound
+    min_fraction: float  # Share of region pixels in range needed to fire
+
+
+def signature_fraction(img: Image.Image, signature: ColorSignature) -> float:
+    """Share of the signature region's pixels that fall inside its colour range"""
+    # Only the small region is copied out of the capture, never the whole frame
+    region = np.asarray(img.crop(roi_to_box(signature.roi, img.size)))
+    if region.ndim != 3 or region.shape[2] < 3:
+        return 0.0
+    # Channel by channel on 2-D views; reducing over a length-3 axis is far slower
+    inside = None
+    for channel, (lower, upper) in enumerate(zip(signature.lower, signature.upper)):
+        values = region[:, :, channel]
+        in_range = (values >= lower) & (values <= upper)
+        inside = in_range if inside is None else inside & in_range
+    return float(np.count_nonzero(inside)) / inside.size
+
+
+def signature_fires(img: Image.Image, signature: ColorSignature) -> bool:
+    return signature_fraction(img, signature) >= signature.min_fraction
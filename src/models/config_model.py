@@ -10,6 +10,7 @@ class ConfigModel:
         self.config_file = config_file
         self.logger = logging.getLogger("Dota2AutoAccept.ConfigModel")
         self._config = self._load_default_config()
+        self._listeners = []  # Called with (key, value) after a setting is saved
         self.load()
     
     def _load_default_config(self):
@@ -25,6 +26,38 @@ class ConfigModel:
             "ui_theme": "dark",  # UI theme: "dark", "light", "system"
             "use_modern_ui": True,  # Use modern CustomTkinter UI
             "detection_threshold": 0.7,  # Detection threshold for image matching
+            "detection_cascade": ["frame_gate", "color_signature", "phash", "pyramid"],  # Prefilter stages, cheapest first
+            "detection_engine": "ssim",  # Matcher: "ssim", "chamfer", "classifier", "template" or "fft"
+            "detection_pyramid_enabled": True,  # Reject frames at a coarse scale first
+            "detection_pyramid_scale": 0.125,  # Downsample factor of the coarse level
+            "detection_pyramid_margin": 0.15,  # Coarse score margin below the threshold
+            "classifier_model_file": "popup_classifier.npz",  # Written by tools/train_classifier.py
+            "chamfer_scale": 0.25,  # Downsample factor of the chamfer engine's edge maps
+            "detection_worker_process": False,  # Run capture and detection in a separate process
+            "parallel_scoring_enabled": False,  # Score references on a thread pool
+            "parallel_workers": 0,  # Thread pool size, 0 follows the available cores
+            "early_exit_enabled": True,  # Stop scoring once a reference clearly matches
+            "early_exit_margin": 0.1,  # Score margin above the threshold needed to stop early
+            "color_signature_enabled": True,  # Skip references whose button colour is absent
+            "phash_prefilter_enabled": True,  # Skip references whose hash is too far off
+            "phash_max_distance": 12,  # Max Hamming distance (of 64 bits) to keep a reference
+            "frame_gate_enabled": True,  # Reuse the last result while the screen is unchanged
+            "frame_gate_tolerance": 2.0,  # Mean gray-level difference treated as unchanged
+            "dirty_tiles_enabled": True,  # Rescore only the tiles of a region that changed
+            "dirty_tile_size": 32,  # Tile edge in pixels for dirty-tile scoring
+            "detection_interval": 0.5,  # Seconds between detection ticks
+            "temporal_voting_enabled": True,  # Confirm matches over several ticks before acting
+            "temporal_voting_window": 3,  # Recent ticks considered per reference (n)
+            "temporal_voting_required": 2,  # Ticks over the threshold needed to confirm (k)
+            "temporal_voting_release_margin": 0.05,  # Score drop below the threshold that ends a match
+            "ocr_fallback_enabled": False,  # Read popup text when no reference matched (needs Tesseract)
+            "ocr_languages": "eng",  # Tesseract language codes, e.g. "eng+por"
+            "ocr_cache_size": 64,  # Region reads kept by pixel hash
+            "learned_roi_enabled": True,  # Search only where the popup appeared before
+            "learned_roi_min_matches": 3,  # Matches recorded before the search is narrowed
+            "learned_roi_margin": 0.05,  # Frame fraction added around the learned area
+            "learned_roi_full_search_interval": 30,  # Narrowed frames between full searches
+            "learned_roi_miss_limit": 10,  # Narrowed frames without a match before a full search
             "auto_detect_dota_monitor": False,  # Auto-detect monitor with Dota 2
             "telegram_enabled": False,
             "telegram_bot_token": "",
@@ -81,9 +114,15 @@ class ConfigModel:
             self._config[key] = value
             self.save()
             self.logger.info(f"Config updated: {key} = {value}")
+            for listener in self._listeners:
+                listener(key, value)
         else:
             self.logger.warning(f"Unknown config key: {key}")
     
+    def add_listener(self, listener):
+        """Register a callback run with (key, value) whenever a setting changes"""
+        self._listeners.append(listener)
+    
     def get_all(self):
         """Get all configuration as dictionary"""
         return self._config.copy()
@@ -169,6 +208,262 @@ class ConfigModel:
     def detection_threshold(self, value):
         self.set("detection_threshold", float(value))
 
+    @property
+    def detection_cascade(self):
+        return self._config.get("detection_cascade", ["frame_gate", "color_signature", "phash", "pyramid"])
+    
+    @detection_cascade.setter
+    def detection_cascade(self, value):
+        self.set("detection_cascade", [str(stage) for stage in value])
+
+    @property
+    def detection_engine(self):
+        return self._config.get("detection_engine", "ssim")
+    
+    @detection_engine.setter
+    def detection_engine(self, value):
+        self.set("detection_engine", str(value))
+
+    @property
+    def detection_pyramid_enabled(self):
+        return self._config.get("detection_pyramid_enabled", True)
+    
+    @detection_pyramid_enabled.setter
+    def detection_pyramid_enabled(self, value):
+        self.set("detection_pyramid_enabled", bool(value))
+
+    @property
+    def detection_pyramid_scale(self):
+        return self._config.get("detection_pyramid_scale", 0.125)
+    
+    @detection_pyramid_scale.setter
+    def detection_pyramid_scale(self, value):
+        self.set("detection_pyramid_scale", float(value))
+
+    @property
+    def detection_pyramid_margin(self):
+        return self._config.get("detection_pyramid_margin", 0.15)
+    
+    @detection_pyramid_margin.setter
+    def detection_pyramid_margin(self, value):
+        self.set("detection_pyramid_margin", float(value))
+
+    @property
+    def classifier_model_file(self):
+        return self._config.get("classifier_model_file", "popup_classifier.npz")
+    
+    @classifier_model_file.setter
+    def classifier_model_file(self, value):
+        self.set("classifier_model_file", str(value))
+
+    @property
+    def chamfer_scale(self):
+        return self._config.get("chamfer_scale", 0.25)
+    
+    @chamfer_scale.setter
+    def chamfer_scale(self, value):
+        self.set("chamfer_scale", min(1.0, max(0.05, float(value))))
+
+    @property
+    def detection_worker_process(self):
+        return self._config.get("detection_worker_process", False)
+    
+    @detection_worker_process.setter
+    def detection_worker_process(self, value):
+        self.set("detection_worker_process", bool(value))
+
+    @property
+    def parallel_scoring_enabled(self):
+        return self._config.get("parallel_scoring_enabled", False)
+    
+    @parallel_scoring_enabled.setter
+    def parallel_scoring_enabled(self, value):
+        self.set("parallel_scoring_enabled", bool(value))
+
+    @property
+    def parallel_workers(self):
+        return self._config.get("parallel_workers", 0)
+    
+    @parallel_workers.setter
+    def parallel_workers(self, value):
+        self.set("parallel_workers", int(value))
+
+    @property
+    def early_exit_enabled(self):
+        return self._config.get("early_exit_enabled", True)
+    
+    @early_exit_enabled.setter
+    def early_exit_enabled(self, value):
+        self.set("early_exit_enabled", bool(value))
+
+    @property
+    def early_exit_margin(self):
+        return self._config.get("early_exit_margin", 0.1)
+    
+    @early_exit_margin.setter
+    def early_exit_margin(self, value):
+        self.set("early_exit_margin", float(value))
+
+    @property
+    def color_signature_enabled(self):
+        return self._config.get("color_signature_enabled", True)
+    
+    @color_signature_enabled.setter
+    def color_signature_enabled(self, value):
+        self.set("color_signature_enabled", bool(value))
+
+    @property
+    def phash_prefilter_enabled(self):
+        return self._config.get("phash_prefilter_enabled", True)
+    
+    @phash_prefilter_enabled.setter
+    def phash_prefilter_enabled(self, value):
+        self.set("phash_prefilter_enabled", bool(value))
+
+    @property
+    def phash_max_distance(self):
+        return self._config.get("phash_max_distance", 12)
+    
+    @phash_max_distance.setter
+    def phash_max_distance(self, value):
+        self.set("phash_max_distance", int(value))
+
+    @property
+    def frame_gate_enabled(self):
+        return self._config.get("frame_gate_enabled", True)
+    
+    @frame_gate_enabled.setter
+    def frame_gate_enabled(self, value):
+        self.set("frame_gate_enabled", bool(value))
+
+    @property
+    def frame_gate_tolerance(self):
+        return self._config.get("frame_gate_tolerance", 2.0)
+    
+    @frame_gate_tolerance.setter
+    def frame_gate_tolerance(self, value):
+        self.set("frame_gate_tolerance", float(value))
+
+    @property
+    def dirty_tiles_enabled(self):
+        return self._config.get("dirty_tiles_enabled", True)
+    
+    @dirty_tiles_enabled.setter
+    def dirty_tiles_enabled(self, value):
+        self.set("dirty_tiles_enabled", bool(value))
+
+    @property
+    def dirty_tile_size(self):
+        return self._config.get("dirty_tile_size", 32)
+    
+    @dirty_tile_size.setter
+    def dirty_tile_size(self, value):
+        self.set("dirty_tile_size", max(8, int(value)))
+
+    @property
+    def detection_interval(self):
+        return self._config.get("detection_interval", 0.5)
+    
+    @detection_interval.setter
+    def detection_interval(self, value):
+        self.set("detection_interval", max(0.05, float(value)))
+
+    @property
+    def temporal_voting_enabled(self):
+        return self._config.get("temporal_voting_enabled", True)
+    
+    @temporal_voting_enabled.setter
+    def temporal_voting_enabled(self, value):
+        self.set("temporal_voting_enabled", bool(value))
+
+    @property
+    def temporal_voting_window(self):
+        return self._config.get("temporal_voting_window", 3)
+    
+    @temporal_voting_window.setter
+    def temporal_voting_window(self, value):
+        self.set("temporal_voting_window", max(1, int(value)))
+
+    @property
+    def temporal_voting_required(self):
+        return self._config.get("temporal_voting_required", 2)
+    
+    @temporal_voting_required.setter
+    def temporal_voting_required(self, value):
+        self.set("temporal_voting_required", max(1, int(value)))
+
+    @property
+    def temporal_voting_release_margin(self):
+        return self._config.get("temporal_voting_release_margin", 0.05)
+    
+    @temporal_voting_release_margin.setter
+    def temporal_voting_release_margin(self, value):
+        self.set("temporal_voting_release_margin", float(value))
+
+    @property
+    def ocr_fallback_enabled(self):
+        return self._config.get("ocr_fallback_enabled", False)
+    
+    @ocr_fallback_enabled.setter
+    def ocr_fallback_enabled(self, value):
+        self.set("ocr_fallback_enabled", bool(value))
+
+    @property
+    def ocr_languages(self):
+        return self._config.get("ocr_languages", "eng")
+    
+    @ocr_languages.setter
+    def ocr_languages(self, value):
+        self.set("ocr_languages", str(value))
+
+    @property
+    def ocr_cache_size(self):
+        return self._config.get("ocr_cache_size", 64)
+    
+    @ocr_cache_size.setter
+    def ocr_cache_size(self, value):
+        self.set("ocr_cache_size", max(1, int(value)))
+
+    @property
+    def learned_roi_enabled(self):
+        return self._config.get("learned_roi_enabled", True)
+    
+    @learned_roi_enabled.setter
+    def learned_roi_enabled(self, value):
+        self.set("learned_roi_enabled", bool(value))
+
+    @property
+    def learned_roi_min_matches(self):
+        return self._config.get("learned_roi_min_matches", 3)
+    
+    @learned_roi_min_matches.setter
+    def learned_roi_min_matches(self, value):
+        self.set("learned_roi_min_matches", max(1, int(value)))
+
+    @property
+    def learned_roi_margin(self):
+        return self._config.get("learned_roi_margin", 0.05)
+    
+    @learned_roi_margin.setter
+    def learned_roi_margin(self, value):
+        self.set("learned_roi_margin", max(0.0, float(value)))
+
+    @property
+    def learned_roi_full_search_interval(self):
+        return self._config.get("learned_roi_full_search_interval", 30)
+    
+    @learned_roi_full_search_interval.setter
+    def learned_roi_full_search_interval(self, value):
+        self.set("learned_roi_full_search_interval", max(1, int(value)))
+
+    @property
+    def learned_roi_miss_limit(self):
+        return self._config.get("learned_roi_miss_limit", 10)
+    
+    @learned_roi_miss_limit.setter
+    def learned_roi_miss_limit(self, value):
+        self.set("learned_roi_miss_limit", max(1, int(value)))
+
     @property
     def telegram_enabled(self):
         return self._config.get("telegram_enabled", False)
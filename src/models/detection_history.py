@@ -0,0 +1,41 @@
+from collections import Counter, defaultdict, deque
+from typing import Iterable, List, Optional
+
+
+class DetectionHistory:
+    """Recent detection results used to order references by likelihood
+
+    References that followed the previous match before (for example
+    `read_check` after `dota`) are tried first, then references matched
+    often recently, then the remaining ones in their declared order.
+    """
+
+    def __init__(self, max_length: int = 50):
+        self._recent = deque(maxlen=max_length)
+        self._transitions = defaultdict(Counter)
+        self.last_match: Optional[str] = None
+
+    def record(self, name: str) -> None:
+        """Record the result of a tick; "none" results are ignored"""
+        if name == "none":
+            return
+        if self.last_match is not None and self.last_match != name:
+            self._transitions[self.last_match][name] += 1
+        self._recent.append(name)
+        self.last_match = name
+
+    def order(self, names: Iterable[str]) -> List[str]:
+        """Return names sorted from most to least likely"""
+        names = list(names)
+        recent = Counter(self._recent)
+        following = self._transitions.get(self.last_match, Counter())
+        return sorted(
+            names,
+            key=lambda name: (-following[name], -recent[name], names.index(name)),
+        )
+
+    def clear(self) -> None:
+        """Forget every recorded result"""
+        self._recent.clear()
+        self._transitions.clear()
+        self.last_match = None
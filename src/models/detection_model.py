@@ -1,5 +1,7 @@
 import os
 import logging
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import cv2
 import numpy as np
 import pyautogui
@@ -8,8 +10,25 @@ from PIL import Image
 from skimage.metrics import structural_similarity as ssim
 from typing import Tuple, Optional, Dict, List
 from models.window_model import WindowModel
+from models.reference_cache import ReferenceCache, region_size, roi_to_box
+from models.popup_geometry import client_size, frame_roi, scoring_scale
+from models.reference_pack import PACK_FILE, ReferencePack, load_or_build_reference_pack
+from models.template_matcher import TemplateMatcher
+from models.fft_matcher import FFTMatcher
+from models.chamfer_matcher import ChamferMatcher
+from models.popup_classifier import PopupClassifier
+from models.tiled_ssim import TiledSSIMScorer
+from models.perceptual_hash import dhash, hamming_distance
+from models.color_signature import signature_fires
+from models.ssim_scorer import compute_statistics, ssim_from_statistics
+from models.detection_history import DetectionHistory
+from models.learned_region import LearnedSearchRegion
+from models.detector_cascade import CascadeContext, DetectorCascade
+from models.frame_gate import FrameChangeGate
+from models.ocr_reader import OCRReader, text_score
+from models.reference_manifest import load_reference_manifest
 import psutil
-from utils import get_resource_path
+from utils import get_config_save_path, get_resource_path
 
 # Windows-specific imports with platform check
 if platform.system() == "Windows":
@@ -34,10 +53,37 @@ class DetectionModel:
     def __init__(
         self, screenshot_model=None, score_threshold: float = 0.7, config_model=None
     ):
+        self.references = load_reference_manifest(get_resource_path("bin"))
         self.reference_images = self._load_reference_images()
+        self.reference_rois = {name: spec.roi for name, spec in self.references.items()}
+        self.reference_cache = ReferenceCache()
+        self.reference_pack = self._load_reference_pack(config_model)
+        if self.reference_pack is not None:
+            self.reference_cache.attach_pack(self.reference_pack)
+        else:
+            self.reference_cache.preload(self.reference_images.values())
+        self.reference_hashes = self._compute_reference_hashes()
+        self.template_matcher = TemplateMatcher(self.reference_cache)
+        self.fft_matcher = FFTMatcher(self.reference_cache)
+        self.chamfer_matcher = ChamferMatcher(self.reference_cache)
+        self.popup_classifier = None  # Loaded on first use by the classifier engine
+        self._classifier_path = None
+        self.tiled_scorer = TiledSSIMScorer()
+        self.match_locations = {}  # Matched (x, y, width, height) per reference
+        self.client_rect = None  # Dota client (left, top, right, bottom) in capture pixels
+        self.learned_regions: Dict[str, LearnedSearchRegion] = {}  # Per reference
+        self.detection_history = DetectionHistory()
+        self.last_scores = {}  # Per-reference scores of the last detection
+        self._scoring_pool = None  # Thread pool for parallel reference scoring
+        self._scoring_pool_size = 0
         self.screenshot_model = screenshot_model
-        self.ocr_cache = {}
+        self.ocr_cache = OrderedDict()  # Read text per region pixel hash, least recent first
+        self.ocr_reader = OCRReader(self.ocr_cache)
         self.config_model = config_model
+        self.frame_gate = FrameChangeGate(
+            config_model.frame_gate_tolerance if config_model else 2.0
+        )
+        self.cascade = DetectorCascade(self)
         # Use threshold from config if available, otherwise use the passed parameter
         if config_model and hasattr(config_model, "detection_threshold"):
             self.score_threshold = config_model.detection_threshold
@@ -55,19 +101,108 @@ class DetectionModel:
             self.config_model.detection_threshold = threshold
 
     def _load_reference_images(self) -> dict:
-        """Load reference images for detection"""
-        base_path = get_resource_path("bin")
-        references = {
-            "dota": os.path.join(base_path, "dota.png"),
-            "dota2_plus": os.path.join(base_path, "dota2_plus.jpeg"),
-            "read_check": os.path.join(base_path, "read_check.jpg"),
-            "ad": os.path.join(base_path, "AD.png"),
-        }
+        """Load reference images declared in the bin/ manifest"""
+        references = {name: spec.path for name, spec in self.references.items()}
         for name, path in references.items():
             if not os.path.exists(path):
                 print(f"⚠️ Reference image not found: {path}")
         return references
 
+    def threshold_for(self, name: str) -> float:
+        """Detection threshold of a reference, falling back to the global threshold"""
+        spec = self.references.get(name)
+        if spec is not None and spec.threshold is not None:
+            return spec.threshold
+        return self.score_threshold
+
+    def get_reference_action(self, name: str) -> str:
+        """Action declared in the manifest for a reference"""
+        spec = self.references.get(name)
+        return spec.action if spec is not None else "none"
+
+    def _color_mode(self, name: str) -> str:
+        spec = self.references.get(name)
+        return spec.color_mode if spec is not None else "RGB"
+
+    def _load_reference_pack(self, config_model=None) -> Optional[ReferencePack]:
+        """Memory-map the precompiled reference pack, rebuilding it when a source changed"""
+        scales = [1.0]
+        statistics_scales = []
+        if config_model:
+            scales.append(config_model.detection_pyramid_scale)
+            statistics_scales.append(config_model.detection_pyramid_scale)
+        try:
+            # A pack shipped in bin/ is used as-is while it matches the references
+            pack = ReferencePack.load(get_resource_path(os.path.join("bin", PACK_FILE)))
+            if pack is not None:
+                if pack.is_current(self.references, scales):
+                    return pack
+                pack.close()
+            return load_or_build_reference_pack(
+                get_config_save_path(PACK_FILE),
+                self.references,
+                self.reference_cache,
+                scales,
+                statistics_scales,
+            )
+        except Exception as e:
+            print(f"⚠️ Reference pack unavailable, preparing references on demand: {e}")
+            return None
+
+    def _compute_reference_hashes(self) -> Dict[str, int]:
+        """Perceptual hash of each reference's region of interest"""
+        if self.reference_pack is not None:
+            return self.reference_pack.hashes
+        hashes = {}
+        for name, ref_path in self.reference_images.items():
+            reference = self.reference_cache.get_decoded(ref_path)
+            if reference is None:
+                continue
+            roi = self.reference_rois.get(name)
+            if roi is not None:
+                reference = reference.crop(roi_to_box(roi, reference.size))
+            hashes[name] = dhash(reference)
+        return hashes
+
+    def _filter_by_signature(self, img: Image.Image, names: List[str]) -> List[str]:
+        """Keep references whose colour signature fires, or that declare none"""
+        candidates = []
+        fired = {}
+        for name in names:
+            spec = self.references.get(name)
+            signature = spec.signature if spec is not None else None
+            if signature is None:
+                candidates.append(name)
+                continue
+            signature = signature._replace(
+                roi=self._popup_region(self.reference_images[name], signature.roi, img.size)[0]
+            )
+            # Popups sharing a signature are checked once per frame
+            if signature not in fired:
+                fired[signature] = signature_fires(img, signature)
+            if fired[signature]:
+                candidates.append(name)
+        return candidates
+
+    def _filter_by_hash(self, img: Image.Image, names: List[str]) -> List[str]:
+        """Keep only references whose region hash is close to the frame's"""
+        max_distance = self.config_model.phash_max_distance
+        frame_hashes = {}
+        candidates = []
+        for name in names:
+            reference_hash = self.reference_hashes.get(name)
+            if reference_hash is None:
+                candidates.append(name)
+                continue
+            roi, _ = self._popup_region(
+                self.reference_images[name], self.reference_rois.get(name), img.size
+            )
+            if roi not in frame_hashes:
+                frame_hashes[roi] = dhash(img.crop(roi_to_box(roi, img.size)))
+            if hamming_distance(frame_hashes[roi], reference_hash) <= max_distance:
+                candidates.append(name)
+        return candidates
+
     def compare_images_file(self, img1_path: str, img2_path: str) -> float:
         """Compare two image files and return similarity score"""
         try:
@@ -92,78 +227,481 @@ class DetectionModel:
             print(f"❌ Error comparing images: {e}")
             return 0.0
 
-    def compare_image_with_reference(self, img: Image.Image, ref_path: str) -> float:
+    def compare_image_with_reference(
+        self,
+        img: Image.Image,
+        ref_path: str,
+        roi: Optional[Tuple[float, float, float, float]] = None,
+    ) -> float:
         try:
-            # Load reference image using PIL to avoid OpenCV color space issues
-            ref_pil = Image.open(
-                ref_path
-            )  # Ensure both images have the same size - resize reference to match input image
-            if ref_pil.size != img.size:
-                ref_pil = ref_pil.resize(img.size, Image.Resampling.LANCZOS)
-
-            # Equalize image channels - convert both to RGB to ensure same number of channels
-            if img.mode != "RGB":
-                img = img.convert("RGB")
-            if ref_pil.mode != "RGB":
-                ref_pil = ref_pil.convert("RGB")
-
-            # Convert PIL Images to numpy arrays (raw data)
-            img_np = np.array(img)
-            ref_np = np.array(ref_pil)
+            # Only the popup's region is compared, at the reference's own pixel size
+            region, scale = self._popup_region(ref_path, roi, img.size)
+            # Equalize image channels - compare everything as RGB
+            return self._compare_array_with_reference(
+                self._frame_region(img, region, {}, scale, "RGB"), ref_path, roi
+            )
+        except Exception as e:
+            print(f"❌ Error comparing image with reference: {e}")
+            return 0.0
+
+    def _compare_array_with_reference(
+        self,
+        img_np: np.ndarray,
+        ref_path: str,
+        roi: Optional[Tuple[float, float, float, float]] = None,
+    ) -> float:
+        """Compare an RGB frame crop against the cached reference crop of the same region"""
+        try:
+            size = (img_np.shape[1], img_np.shape[0])
+            # Cropped, resized and filtered once per capture geometry by the reference cache
+            ref_stats = self.reference_cache.get_statistics([ref_path], size, "RGB", roi)
+            if ref_stats is None:
+                return 0.0
 
             # Verify both arrays have the same shape (should be guaranteed now)
-            if img_np.shape != ref_np.shape:
+            if img_np.shape != ref_stats.values.shape[1:]:
                 print(
-                    f"⚠️ Image shapes don't match after equalization: {img_np.shape} vs {ref_np.shape}"
+                    f"⚠️ Image shapes don't match after equalization: {img_np.shape} vs {ref_stats.values.shape[1:]}"
                 )
                 return 0.0
 
             # Compute SSIM on raw color images without any color space conversion
-            score, _ = ssim(img_np, ref_np, full=True, channel_axis=2)
-
-            return score
+            return float(ssim_from_statistics(compute_statistics(img_np), ref_stats)[0])
         except Exception as e:
             print(f"❌ Error comparing image with reference: {e}")
             return 0.0
 
+    def _frame_region(
+        self, img: Image.Image, roi, crops: dict, scale: float = 1.0, mode: str = "RGB"
+    ) -> np.ndarray:
+        """(H, W, C) array of the frame's region of interest, optionally downsampled"""
+        key = (roi, scale, mode)
+        # References sharing a region share one crop of the frame
+        crop = crops.get(key)
+        if crop is None:
+            region = img.crop(roi_to_box(roi, img.size)) if roi else img
+            if scale != 1.0:
+                size = region_size(None, region.size, scale)
+                region = region.resize(size, Image.Resampling.BOX)
+            if region.mode != mode:
+                region = region.convert(mode)
+            crop = np.asarray(region)
+            if crop.ndim == 2:
+                crop = crop[:, :, np.newaxis]
+            crops[key] = crop
+        return crop
+
+    def _popup_region(
+        self, ref_path: str, roi, frame_size: Tuple[int, int]
+    ) -> Tuple[Tuple[float, float, float, float], float]:
+        """
+        Frame ROI showing a reference's region, and the downsample factor it is
+        scored at so the reference is never stretched or upscaled
+        """
+        client = self._client_rect(frame_size)
+        reference_size = self.reference_cache.get_size(ref_path) or client_size(client)
+        return (
+            frame_roi(roi, reference_size, frame_size, client),
+            scoring_scale(reference_size, client_size(client)),
+        )
+
+    def _client_rect(self, frame_size: Tuple[int, int]) -> Tuple[int, int, int, int]:
+        """Client rectangle in frame pixels, the whole frame when no window was found"""
+        rect = self.client_rect
+        if rect is None or rect[2] > frame_size[0] or rect[3] > frame_size[1]:
+            return (0, 0, frame_size[0], frame_size[1])
+        return rect
+
+    def update_client_rect(self, monitor: Optional[dict]) -> None:
+        """
+        Locate the Dota 2 client inside the capture of `monitor` (an mss monitor dict)
+        Falls back to the whole capture when the window is not found
+        """
+        rect = self.window_model.get_dota2_client_rect() if monitor else None
+        if rect is None:
+            self.client_rect = None
+            return
+        # Screen coordinates -> capture coordinates, clipped to the monitor
+        left = max(rect[0] - monitor["left"], 0)
+        top = max(rect[1] - monitor["top"], 0)
+        right = min(rect[2] - monitor["left"], monitor["width"])
+        bottom = min(rect[3] - monitor["top"], monitor["height"])
+        self.client_rect = (left, top, right, bottom) if right > left and bottom > top else None
+
+    def _score_references(self, img: Image.Image) -> Dict[str, float]:
+        """Score the popup region of the image against every reference"""
+        self.reference_cache.set_geometry(img.size, self._client_rect(img.size))
+
+        names = [
+            name
+            for name, ref_path in self.reference_images.items()
+            if os.path.exists(ref_path)
+        ]
+        scores = {name: 0.0 for name in self.reference_images}
+
+        # Most likely references first, so an early exit happens as soon as possible
+        names = self.detection_history.order(names)
+        exit_margin = None
+        if self.config_model and self.config_model.early_exit_enabled:
+            exit_margin = self.config_model.early_exit_margin
+
+        # Cheap stages reject most frames before the engine runs
+        scores.update(self.cascade.run(CascadeContext(img, names, exit_margin)))
+        return scores
+
+    def get_cascade_statistics(self) -> Dict[str, dict]:
+        """Per-stage timing and pass/reject counters of the detector cascade"""
+        return self.cascade.report()
+
+    def print_cascade_statistics(self):
+        """Print per-stage timings and pass/reject counters of the detector cascade"""
+        self.cascade.print_report()
+
+    def _score_batched(
+        self,
+        img: Image.Image,
+        names: List[str],
+        crops: dict,
+        scale: float = 1.0,
+        exit_margin: Optional[float] = None,
+    ) -> Dict[str, float]:
+        """
+        SSIM of the frame against references, one vectorized pass per shared region
+        Stops after the first reference that clears its threshold by `exit_margin`
+        """
+        groups = {}
+        for name in names:
+            ref_path = self.reference_images[name]
+            key = (
+                self.reference_rois.get(name),
+                self._color_mode(name),
+                self.reference_cache.get_size(ref_path),
+            )
+            groups.setdefault(key, []).append(name)
+
+        jobs = [
+            (img, roi, mode, group, crops, scale)
+            for (roi, mode, _), group in groups.items()
+        ]
+        scores = {}
+        for job, group_scores in zip(jobs, self._map_scoring(self._score_group, jobs)):
+            group = job[3]
+            if group_scores is None:
+                scores.update({name: 0.0 for name in group})
+                continue
+            for name, score in zip(group, group_scores):
+                scores[name] = float(score)
+            if exit_margin is not None and any(
+                scores[name] >= self.threshold_for(name) + exit_margin for name in group
+            ):
+                break
+        return scores
+
+    def _score_group(
+        self,
+        img: Image.Image,
+        roi,
+        mode: str,
+        group: List[str],
+        crops: dict,
+        scale: float,
+    ) -> Optional[np.ndarray]:
+        """SSIM of one frame region against every reference sharing that region"""
+        region, work_scale = self._popup_region(self.reference_images[group[0]], roi, img.size)
+        crop = self._frame_region(img, region, crops, scale * work_scale, mode)
+        size = (crop.shape[1], crop.shape[0])
+        ref_stats = self.reference_cache.get_statistics(
+            [self.reference_images[name] for name in group],
+            size,
+            mode,
+            roi,
+            ignore=[self.references[name].ignore for name in group],
+        )
+        if ref_stats is None:
+            return None
+        if scale == 1.0 and self.config_model and self.config_model.dirty_tiles_enabled:
+            # Only tiles that changed since this region was last scored are recomputed
+            if self.tiled_scorer.tile_size != self.config_model.dirty_tile_size:
+                self.tiled_scorer = TiledSSIMScorer(self.config_model.dirty_tile_size)
+            return self.tiled_scorer.score((roi, mode, tuple(group)), crop, ref_stats)
+        # Frame statistics are computed once and shared by the whole group
+        return ssim_from_statistics(compute_statistics(crop), ref_stats)
+
+    def _get_scoring_pool(self) -> Optional[ThreadPoolExecutor]:
+        """Bounded thread pool for parallel scoring, or None when running serially"""
+        if not (self.config_model and self.config_model.parallel_scoring_enabled):
+            return None
+        workers = self.config_model.parallel_workers or os.cpu_count() or 1
+        workers = max(1, min(workers, len(self.reference_images)))
+        if workers == 1:
+            return None
+        if self._scoring_pool is None or self._scoring_pool_size != workers:
+            self.shutdown_scoring_pool()
+            self._scoring_pool = ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="DetectionScoring"
+            )
+            self._scoring_pool_size = workers
+        return self._scoring_pool
+
+    def _map_scoring(self, function, jobs: list):
+        """
+        Yield function(*job) for every job, in order
+        NumPy/OpenCV kernels release the GIL, so jobs run on the scoring pool
+        when parallel scoring is enabled. Jobs not yet started are cancelled
+        when the caller stops iterating early.
+        """
+        pool = self._get_scoring_pool() if len(jobs) > 1 else None
+        if pool is None:
+            for job in jobs:
+                yield function(*job)
+            return
+        futures = [pool.submit(function, *job) for job in jobs]
+        try:
+            for future in futures:
+                yield future.result()
+        finally:
+            for future in futures:
+                future.cancel()
+
+    def shutdown_scoring_pool(self):
+        """Stop the parallel scoring threads"""
+        if self._scoring_pool is not None:
+            self._scoring_pool.shutdown(wait=False, cancel_futures=True)
+            self._scoring_pool = None
+            self._scoring_pool_size = 0
+
+    def _detection_engine(self) -> str:
+        """Selected matching engine, "ssim" unless configured otherwise"""
+        if self.config_model:
+            return self.config_model.detection_engine
+        return "ssim"
+
+    def _score_references_template(
+        self,
+        img: Image.Image,
+        names: List[str],
+        scores: Dict[str, float],
+        exit_margin: Optional[float] = None,
+    ) -> Dict[str, float]:
+        """Score references with scale-tolerant template matching, recording locations"""
+        frame, work_scale = self.template_matcher.prepare_frame(img)
+        client = client_size(self._client_rect(img.size))
+        self.match_locations = {}
+        regions = {
+            name: self._search_region(name, frame, work_scale, img.size, self.template_matcher)
+            for name in names
+        }
+        jobs = [
+            (
+                regions[name][0],
+                work_scale,
+                img.size,
+                self.reference_images[name],
+                self.reference_rois.get(name),
+                client,
+            )
+            for name in names
+        ]
+        for name, (score, location) in zip(
+            names, self._map_scoring(self.template_matcher.match, jobs)
+        ):
+            scores[name] = score
+            self.match_locations[name] = self._offset_location(location, regions[name][1])
+            if exit_margin is not None and score >= self.threshold_for(name) + exit_margin:
+                break
+        self._learn_regions(img.size, scores, regions)
+        return scores
+
+    def _score_references_fft(
+        self, img: Image.Image, names: List[str], scores: Dict[str, float]
+    ) -> Dict[str, float]:
+        """Score every reference at once with batched FFT cross-correlation"""
+        frame, work_scale = self.fft_matcher.prepare_frame(img)
+        client = client_size(self._client_rect(img.size))
+        self.match_locations = {}
+        regions = {
+            name: self._search_region(name, frame, work_scale, img.size, self.fft_matcher)
+            for name in names
+        }
+        # References searched in the same region share one batched pass
+        batches = {}
+        for name in names:
+            region, origin, _ = regions[name]
+            batches.setdefault((origin, region.shape), []).append(name)
+        for batch in batches.values():
+            region, origin, _ = regions[batch[0]]
+            references = [
+                (self.reference_images[name], self.reference_rois.get(name)) for name in batch
+            ]
+            for name, (score, location) in zip(
+                batch,
+                self.fft_matcher.match_all(region, work_scale, img.size, references, client),
+            ):
+                scores[name] = score
+                self.match_locations[name] = self._offset_location(location, origin)
+        self._learn_regions(img.size, scores, regions)
+        return scores
+
+    def _search_region(
+        self,
+        name: str,
+        frame: np.ndarray,
+        work_scale: float,
+        frame_size: Tuple[int, int],
+        matcher: TemplateMatcher,
+    ) -> Tuple[np.ndarray, Tuple[int, int], bool]:
+        """
+        Part of a prepared frame a position-tolerant engine searches for one reference
+        Returns (region, (x, y) origin in frame pixels, narrowed)
+        """
+        region = self._learned_region(name)
+        box = region.search_box(frame_size) if region is not None else None
+        if box is None:
+            return frame, (0, 0), False
+        left, top, right, bottom = (int(round(value * work_scale)) for value in box)
+        # A box too small for the reference's largest template can not find it
+        width, height = matcher.template_extent(
+            self.reference_images[name],
+            self.reference_rois.get(name),
+            frame_size,
+            client_size(self._client_rect(frame_size)),
+        )
+        if right - left < width or bottom - top < height:
+            return frame, (0, 0), False
+        origin = (int(left / work_scale), int(top / work_scale))
+        return frame[top:bottom, left:right], origin, True
+
+    def _learned_region(self, name: str, create: bool = False) -> Optional[LearnedSearchRegion]:
+        """A reference's learned search region with the configured settings"""
+        if not (self.config_model and self.config_model.learned_roi_enabled):
+            return None
+        region = self.learned_regions.get(name)
+        if region is None:
+            if not create:
+                return None
+            region = self.learned_regions[name] = LearnedSearchRegion()
+        region.min_matches = self.config_model.learned_roi_min_matches
+        region.margin = self.config_model.learned_roi_margin
+        region.full_search_interval = self.config_model.learned_roi_full_search_interval
+        region.miss_limit = self.config_model.learned_roi_miss_limit
+        return region
+
+    def _offset_location(self, location, origin: Tuple[int, int]):
+        """Location found in a search region, moved to frame pixels"""
+        if location is None:
+            return None
+        x, y, width, height = location
+        return (x + origin[0], y + origin[1], width, height)
+
+    def _learn_regions(self, frame_size: Tuple[int, int], scores: Dict[str, float], regions: dict):
+        """Record where each scored reference matched, or that it did not"""
+        for name, location in self.match_locations.items():
+            matched = location is not None and scores.get(name, 0.0) >= self.threshold_for(name)
+            region = self._learned_region(name, create=matched)
+            if region is not None:
+                region.record(location if matched else None, frame_size, regions[name][2])
+
+    def _score_references_chamfer(
+        self,
+        img: Image.Image,
+        names: List[str],
+        scores: Dict[str, float],
+        crops: dict,
+        exit_margin: Optional[float] = None,
+    ) -> Dict[str, float]:
+        """Score references by chamfer distance between edge maps of a downscaled region"""
+        scale = self.config_model.chamfer_scale if self.config_model else 0.25
+        frame_maps = {}
+        for name in names:
+            roi = self.reference_rois.get(name)
+            region, work_scale = self._popup_region(self.reference_images[name], roi, img.size)
+            key = (region, work_scale)
+            if key not in frame_maps:
+                crop = self._frame_region(img, region, crops, scale * work_scale, "L")
+                frame_maps[key] = self.chamfer_matcher.edge_maps(
+                    np.ascontiguousarray(crop[:, :, 0])
+                )
+            score = self.chamfer_matcher.score(frame_maps[key], self.reference_images[name], roi)
+            scores[name] = score
+            if exit_margin is not None and score >= self.threshold_for(name) + exit_margin:
+                break
+        return scores
+
+    def _get_classifier(self) -> Optional[PopupClassifier]:
+        """Trained popup classifier from the configured model file, loaded once"""
+        model_file = self.config_model.classifier_model_file if self.config_model else ""
+        path = get_config_save_path(model_file)
+        if path != self._classifier_path:
+            self._classifier_path = path
+            self.popup_classifier = PopupClassifier.load(path)
+            if self.popup_classifier is None:
+                print(f"⚠️ Popup classifier not found at {path}, falling back to SSIM")
+        return self.popup_classifier
+
+    def _score_references_classifier(
+        self,
+        img: Image.Image,
+        names: List[str],
+        scores: Dict[str, float],
+        crops: dict,
+        exit_margin: Optional[float] = None,
+    ) -> Dict[str, float]:
+        """Score references with the trained classifier's probabilities"""
+        classifier = self._get_classifier()
+        if classifier is None:
+            scores.update(self._score_batched(img, names, crops, exit_margin=exit_margin))
+            return scores
+        probabilities = classifier.predict(img)
+        for name in names:
+            scores[name] = probabilities.get(name, 0.0)
+        return scores
+
+    def _score_references_ocr(
+        self, img: Image.Image, names: List[str], scores: Dict[str, float]
+    ) -> Dict[str, float]:
+        """Score references by how closely their OCR region's text matches a keyword"""
+        reader = self.ocr_reader
+        reader.languages = self.config_model.ocr_languages
+        reader.max_entries = self.config_model.ocr_cache_size
+        for name in names:
+            spec = self.references.get(name)
+            if spec is None or spec.ocr is None:
+                continue
+            roi, _ = self._popup_region(self.reference_images[name], spec.ocr.roi, img.size)
+            score = text_score(reader.read(img, roi), spec.ocr.keywords)
+            scores[name] = max(scores.get(name, 0.0), score)
+        return scores
+
+    def get_match_location(self, name: str) -> Optional[Tuple[int, int, int, int]]:
+        """Location (x, y, width, height) where a reference matched on the last frame"""
+        return self.match_locations.get(name)
+
     def detect_match_in_image(self, img: Image.Image) -> str:
         """
         Detect reference patterns in the given image
         Returns the name of the reference image with the highest score
         """
-        scores = {}
-        for name, ref_path in self.reference_images.items():
-            if os.path.exists(ref_path):
-                score = self.compare_image_with_reference(img, ref_path)
-                scores[name] = score
-            else:
-                scores[name] = 0.0
-        if scores:
-            highest_score_name = max(scores, key=scores.get)
-            highest_score = scores[highest_score_name]
-            if highest_score >= self.score_threshold:
-                return highest_score_name
-        return "none"
+        return self.detect_match_in_image_with_score(img)[0]
 
     def detect_match_in_image_with_score(self, img: Image.Image) -> Tuple[str, float]:
         """
         Detect reference patterns in the given image
         Returns (name, score) of the reference image with the highest score
         """
-        scores = {}
-        for name, ref_path in self.reference_images.items():
-            if os.path.exists(ref_path):
-                score = self.compare_image_with_reference(img, ref_path)
-                scores[name] = score
-            else:
-                scores[name] = 0.0
+        scores = self._score_references(img)
+        self.last_scores = scores
         if scores:
-            highest_score_name = max(scores, key=scores.get)
-            highest_score = scores[highest_score_name]
-            if highest_score >= self.score_threshold:
-                return highest_score_name, highest_score
-            else:
-                return "none", highest_score
+            # Each reference is held to its own threshold from the manifest
+            matched = {
+                name: score
+                for name, score in scores.items()
+                if score >= self.threshold_for(name)
+            }
+            if matched:
+                highest_score_name = max(matched, key=matched.get)
+                self.detection_history.record(highest_score_name)
+                return highest_score_name, matched[highest_score_name]
+            return "none", max(scores.values())
         return "none", 0.0
 
     def send_enter_key(self):
@@ -192,16 +730,18 @@ class DetectionModel:
             else:
                 print("❌ Failed to focus Dota 2 window, but continuing with action")
 
-        if highest_match == "read_check":
-            print("📖 Read-check pattern detected - confirming with Enter")
+        # The action for each reference comes from the bin/ manifest
+        declared_action = self.get_reference_action(highest_match)
+        if declared_action == "read_check_detected":
+            print(f"📖 Read-check pattern detected ({highest_match}) - confirming with Enter")
             pyautogui.press("enter")
             action = "read_check_detected"
-        elif highest_match in ["dota", "dota2_plus"]:
+        elif declared_action == "match_detected":
             print(f"🎉 Match detected ({highest_match}) - accepting with Enter")
             pyautogui.press("enter")
             action = "match_detected"
-        elif highest_match == "ad":
-            print("📺 Advertisement detected - window focused")
+        elif declared_action == "ad_detected":
+            print(f"📺 Advertisement detected ({highest_match}) - window focused")
             action = "ad_detected"
 
         print(f"✅ Action completed: {action}")
@@ -229,11 +769,7 @@ class DetectionModel:
 
     def get_dota2_window_debug_info(self) -> dict:
         """Get debugging information about Dota 2 windows"""
-        return {
-            "processes": self.window_model.get_dota2_processes(),
-            "windows": self.window_model.get_dota2_windows(),
-            "all_related": self.window_model.list_all_dota2_related_windows(),
-        }
+        return self.window_model.get_debug_info()
 
     def find_dota2_monitor(self) -> Optional[int]:
         """
@@ -0,0 +1,172 @@
+import time
+import logging
+import threading
+import numpy as np
+from multiprocessing import shared_memory
+from PIL import Image
+from typing import Optional, Tuple
+
+
+class SharedFrameBuffer:
+    """Two-slot RGB frame buffer in shared memory
+
+    The detection worker writes each capture into alternating slots and
+    tells the GUI process which slot holds the latest frame, so frames are
+    never pickled across the process boundary. Every slot has a sequence
+    number that is odd while the slot is being written, so a reader can
+    tell when the worker reused the slot during its copy.
+    """
+
+    SLOTS = 2
+    HEADER = 8 * SLOTS  # One uint64 sequence number per slot
+
+    def __init__(self, capacity: int, name: Optional[str] = None, create: bool = False):
+        self.capacity = capacity  # Bytes per slot
+        if create:
+            self.shm = shared_memory.SharedMemory(
+                create=True, size=self.HEADER + capacity * self.SLOTS
+            )
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        self._sequences = np.ndarray((self.SLOTS,), dtype=np.uint64, buffer=self.shm.buf)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def _view(self, slot: int, size: Tuple[int, int]) -> np.ndarray:
+        width, height = size
+        return np.ndarray(
+            (height, width, 3),
+            dtype=np.uint8,
+            buffer=self.shm.buf,
+            offset=self.HEADER + slot * self.capacity,
+        )
+
+    def sequence(self, slot: int) -> int:
+        """Sequence number of a slot, even when no write is in progress"""
+        return int(self._sequences[slot])
+
+    def write(self, slot: int, img: Image.Image) -> Optional[Tuple[int, int]]:
+        """Copy an image into a slot; returns its size, or None if it does not fit"""
+        if img.width * img.height * 3 > self.capacity:
+            return None
+        if img.mode != "RGB":
+            img = img.convert("RGB")
+        self._sequences[slot] += 1  # Odd: write in progress
+        self._view(slot, img.size)[...] = np.asarray(img)
+        self._sequences[slot] += 1
+        return img.size
+
+    def read(self, slot: int, size: Tuple[int, int], sequence: int) -> Optional[Image.Image]:
+        """
+        Copy the frame written as `sequence` out of a slot into a standalone image
+        Returns None when the slot was rewritten before or during the copy
+        """
+        if self.sequence(slot) != sequence:
+            return None
+        pixels = self._view(slot, size).copy()
+        if self.sequence(slot) != sequence:
+            return None
+        return Image.fromarray(pixels)
+
+    def close(self):
+        # Views on the buffer must be gone before the mapping can be closed
+        self._sequences = None
+        self.shm.close()
+
+    def unlink(self):
+        try:
+            self.shm.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class _SilentAudioModel:
+    """Audio stand-in for the worker; the GUI process plays the alert itself"""
+
+    def play_alert_sound(self, device_id=None, volume: float = 1.0):
+        pass
+
+
+def run_detection_worker(
+    config_file: str,
+    buffer_name: str,
+    buffer_capacity: int,
+    results,
+    commands,
+    stop_event,
+):
+    """
+    Entry point of the detection worker process
+
+    Runs the regular detection loop (capture, scoring and the window/Enter
+    action) away from the Tk interpreter. Frames go into the shared frame
+    buffer and only small result messages are put on `results`.
+    """
+    # The worker runs the regular controller stack; imported here so models/
+    # does not depend on controllers/ at import time
+    from models.config_model import ConfigModel
+    from models.screenshot_model import ScreenshotModel
+    from models.detection_model import DetectionModel
+    from controllers.detection_controller import DetectionController
+
+    logger = logging.getLogger("Dota2AutoAccept.DetectionWorker")
+    frames = SharedFrameBuffer(buffer_capacity, name=buffer_name)
+    config_model = ConfigModel(config_file)
+    detection_model = DetectionModel(config_model=config_model)
+    controller = DetectionController(
+        detection_model, ScreenshotModel(), _SilentAudioModel(), config_model
+    )
+    frame_id = 0
+
+    def on_detection_update(img, highest_match, highest_score):
+        nonlocal frame_id
+        slot = frame_id % SharedFrameBuffer.SLOTS
+        size = frames.write(slot, img) if img is not None else None
+        results.put(
+            {
+                "type": "update",
+                "match": highest_match,
+                "score": float(highest_score),
+                "slot": slot if size else None,
+                "size": size,
+                "sequence": frames.sequence(slot),
+                "timestamp": time.time(),
+            }
+        )
+        frame_id += 1
+
+    def on_match_found():
+        results.put({"type": "match_found"})
+
+    def apply_commands():
+        while not stop_event.is_set():
+            try:
+                command = commands.get(timeout=0.2)
+            except Exception:
+                continue
+            kind = command.get("type")
+            if kind == "threshold":
+                # Saved to config.json by the GUI process already
+                detection_model.score_threshold = command["value"]
+            elif kind == "reload_config":
+                # Pick up settings the GUI saved while detection was running
+                config_model.load()
+                detection_model.score_threshold = config_model.detection_threshold
+
+    controller.on_detection_update = on_detection_update
+    controller.on_match_found = on_match_found
+    threading.Thread(target=apply_commands, daemon=True).start()
+
+    try:
+        controller.start_detection()
+        while controller.is_running and not stop_event.wait(0.2):
+            pass
+    except Exception as e:
+        logger.error(f"Detection worker failed: {e}")
+    finally:
+        controller.stop_detection()
+        detection_model.shutdown_scoring_pool()
+        results.put({"type": "stopped"})
+        frames.close()
@@ -0,0 +1,354 @@
+import time
+import logging
+from typing import Dict, List, Optional
+from PIL import Image
+
+
+class CascadeContext:
+    """State of one frame as it moves through the cascade"""
+
+    def __init__(self, img: Image.Image, names: List[str], exit_margin: Optional[float]):
+        self.img = img
+        self.candidates = list(names)  # Every reference the frame was checked for
+        self.names = list(names)  # Candidates still in the running
+        self.scores: Dict[str, float] = {}
+        self.crops = {}  # Frame regions shared between stages
+        self.exit_margin = exit_margin
+        self.resolved = False  # Set when a stage settled the frame on its own
+        self.signature = None
+
+
+class StageStatistics:
+    """Timing and pass/reject counters of one stage"""
+
+    def __init__(self):
+        self.calls = 0
+        self.passed = 0
+        self.rejected = 0
+        self.seconds = 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "calls": self.calls,
+            "passed": self.passed,
+            "rejected": self.rejected,
+            "mean_ms": self.seconds / self.calls * 1000 if self.calls else 0.0,
+        }
+
+
+class CascadeStage:
+    """One detector of the cascade
+
+    `run` narrows `context.names` to the references still worth checking;
+    leaving no candidates rejects the frame. Engines, the last stage, keep
+    only the references that reached their threshold. Stages that need the
+    popup at its usual position set `aligned` and are skipped for
+    position-tolerant engines.
+    """
+
+    name = ""
+    aligned = False
+
+    def __init__(self, model):
+        self.model = model
+        self.statistics = StageStatistics()
+
+    def enabled(self) -> bool:
+        return True
+
+    def run(self, context: CascadeContext) -> None:
+        raise NotImplementedError
+
+    def finish(self, context: CascadeContext) -> None:
+        """Called once the cascade scored a frame this stage let through"""
+
+    def keep_matches(self, context: CascadeContext) -> None:
+        context.names = [
+            name
+            for name in context.names
+            if context.scores.get(name, 0.0) >= self.model.threshold_for(name)
+        ]
+
+
+class FrameGateStage(CascadeStage):
+    """Reuses the previous scores while the screen is unchanged"""
+
+    name = "frame_gate"
+
+    def enabled(self) -> bool:
+        return self.model.config_model.frame_gate_enabled
+
+    def run(self, context: CascadeContext) -> None:
+        gate = self.model.frame_gate
+        gate.tolerance = self.model.config_model.frame_gate_tolerance
+        reuse, scores, context.signature = gate.check(context.img)
+        if reuse:
+            context.scores.update(scores)
+            context.names = []
+            context.resolved = True
+
+    def finish(self, context: CascadeContext) -> None:
+        if context.signature is not None:
+            self.model.frame_gate.store(context.signature, dict(context.scores))
+
+
+class ColorSignatureStage(CascadeStage):
+    """Counts accept-button coloured pixels in a small region of the raw capture"""
+
+    name = "color_signature"
+    aligned = True
+
+    def enabled(self) -> bool:
+        return self.model.config_model.color_signature_enabled
+
+    def run(self, context: CascadeContext) -> None:
+        context.names = self.model._filter_by_signature(context.img, context.names)
+
+
+class PerceptualHashStage(CascadeStage):
+    """Drops references whose region hash is far from the frame's"""
+
+    name = "phash"
+    aligned = True
+
+    def enabled(self) -> bool:
+        return self.model.config_model.phash_prefilter_enabled
+
+    def run(self, context: CascadeContext) -> None:
+        context.names = self.model._filter_by_hash(context.img, context.names)
+
+
+class PyramidStage(CascadeStage):
+    """Coarse SSIM; only references close to their threshold go on"""
+
+    name = "pyramid"
+    aligned = True
+
+    def enabled(self) -> bool:
+        # The coarse level is SSIM, so it only screens frames for the SSIM engine
+        return (
+            self.model.config_model.detection_pyramid_enabled
+            and self.model._detection_engine() == "ssim"
+        )
+
+    def run(self, context: CascadeContext) -> None:
+        config = self.model.config_model
+        coarse = self.model._score_batched(
+            context.img, context.names, context.crops, config.detection_pyramid_scale
+        )
+        context.scores.update(coarse)
+        context.names = [
+            name
+            for name in context.names
+            if coarse[name] >= self.model.threshold_for(name) - config.detection_pyramid_margin
+        ]
+
+
+class SSIMStage(CascadeStage):
+    """Full-resolution SSIM of the aligned popup region"""
+
+    name = "ssim"
+    aligned = True
+
+    def run(self, context: CascadeContext) -> None:
+        context.scores.update(
+            self.model._score_batched(
+                context.img, context.names, context.crops, exit_margin=context.exit_margin
+            )
+        )
+        self.keep_matches(context)
+
+
+class TemplateStage(CascadeStage):
+    """Scale-tolerant template matching anywhere in the frame"""
+
+    name = "template"
+
+    def run(self, context: CascadeContext) -> None:
+        self.model._score_references_template(
+            context.img, context.names, context.scores, context.exit_margin
+        )
+        self.keep_matches(context)
+
+
+class FFTStage(CascadeStage):
+    """Batched FFT cross-correlation of every template anywhere in the frame"""
+
+    name = "fft"
+
+    def run(self, context: CascadeContext) -> None:
+        self.model._score_references_fft(context.img, context.names, context.scores)
+        self.keep_matches(context)
+
+
+class ChamferStage(CascadeStage):
+    """Edge-map chamfer matching of the aligned popup region at a reduced scale"""
+
+    name = "chamfer"
+    aligned = True
+
+    def run(self, context: CascadeContext) -> None:
+        self.model._score_references_chamfer(
+            context.img, context.names, context.scores, context.crops, context.exit_margin
+        )
+        self.keep_matches(context)
+
+
+class ClassifierStage(CascadeStage):
+    """Trained softmax classifier over a thumbnail of the popup area"""
+
+    name = "classifier"
+    aligned = True
+
+    def run(self, context: CascadeContext) -> None:
+        self.model._score_references_classifier(
+            context.img, context.names, context.scores, context.crops, context.exit_margin
+        )
+        self.keep_matches(context)
+
+
+class OCRStage(CascadeStage):
+    """Reads the popup's button or title text when the engine found nothing"""
+
+    name = "ocr"
+    aligned = True
+
+    def enabled(self) -> bool:
+        return self.model.config_model.ocr_fallback_enabled and self.model.ocr_reader.available()
+
+    def run(self, context: CascadeContext) -> None:
+        self.model._score_references_ocr(context.img, context.names, context.scores)
+        self.keep_matches(context)
+
+
+# Prefilter stages that can be listed in `detection_cascade`
+STAGES = {
+    stage.name: stage
+    for stage in (FrameGateStage, ColorSignatureStage, PerceptualHashStage, PyramidStage)
+}
+
+# Final matchers selected by `detection_engine`
+ENGINES = {
+    stage.name: stage
+    for stage in (SSIMStage, TemplateStage, FFTStage, ChamferStage, ClassifierStage)
+}
+
+# Detectors tried on the remaining references when the engine matched nothing
+FALLBACKS = {stage.name: stage for stage in (OCRStage,)}
+
+
+class DetectorCascade:
+    """Runs the configured detectors from cheapest to most expensive
+
+    The prefilter stages listed in `detection_cascade` run in that order and
+    the configured detection engine always runs last. When nothing matched,
+    the enabled fallbacks get another look at every reference the frame was
+    checked for. Per-stage timings and counters are kept for the lifetime of
+    the model and logged periodically.
+    """
+
+    def __init__(self, model, report_interval: int = 500):
+        self.logger = logging.getLogger("Dota2AutoAccept.DetectorCascade")
+        self.model = model
+        self.report_interval = report_interval
+        self.frames = 0
+        self.stages = {
+            name: stage(model) for name, stage in {**STAGES, **ENGINES, **FALLBACKS}.items()
+        }
+
+    def pipeline(self) -> List[CascadeStage]:
+        """Enabled stages for the current configuration, in running order"""
+        config = self.model.config_model
+        engine = self.stages.get(self.model._detection_engine(), self.stages["ssim"])
+        names = config.detection_cascade if config else []
+        stages = []
+        for name in names:
+            stage = self.stages.get(name)
+            if stage is None or name not in STAGES:
+                continue
+            if stage.aligned and not engine.aligned:
+                continue
+            if config and stage.enabled():
+                stages.append(stage)
+        stages.append(engine)
+        return stages
+
+    def fallbacks(self) -> List[CascadeStage]:
+        """Enabled fallback stages for the current configuration"""
+        config = self.model.config_model
+        engine = self.stages.get(self.model._detection_engine(), self.stages["ssim"])
+        if not config:
+            return []
+        return [
+            self.stages[name]
+            for name in FALLBACKS
+            if (engine.aligned or not self.stages[name].aligned) and self.stages[name].enabled()
+        ]
+
+    def run(self, context: CascadeContext) -> Dict[str, float]:
+        """Pass a frame through every stage until one rejects or settles it"""
+        finished = []
+        for stage in self.pipeline():
+            if not context.names:
+                break
+            self._run_stage(stage, context)
+            finished.append(stage)
+
+        if not context.resolved and not context.names:
+            for stage in self.fallbacks():
+                context.names = list(context.candidates)
+                self._run_stage(stage, context)
+                finished.append(stage)
+                if context.names:
+                    break
+
+        if not context.resolved:
+            for stage in finished:
+                stage.finish(context)
+
+        self.frames += 1
+        if self.report_interval and self.frames % self.report_interval == 0:
+            self.logger.info(f"Cascade after {self.frames} frames: {self.report()}")
+            self.print_report()
+        return context.scores
+
+    def _run_stage(self, stage: CascadeStage, context: CascadeContext) -> None:
+        start = time.perf_counter()
+        stage.run(context)
+        statistics = stage.statistics
+        statistics.seconds += time.perf_counter() - start
+        statistics.calls += 1
+        if context.names and not context.resolved:
+            statistics.passed += 1
+        else:
+            statistics.rejected += 1
+
+    def report(self) -> Dict[str, dict]:
+        """Timing and counters of every stage that ran at least once"""
+        return {
+            name: stage.statistics.as_dict()
+            for name, stage in self.stages.items()
+            if stage.statistics.calls
+        }
+
+    def print_report(self) -> None:
+        """Print where detection time goes, stage by stage"""
+        print("\n" + "=" * 50)
+        print(f"⏱️ DETECTION CASCADE ({self.frames} frames)")
+        print("=" * 50)
+        report = self.report()
+        if not report:
+            print("   No frames scored yet")
+            return
+        print(f"   {'stage':<16}{'calls':>8}{'passed':>8}{'rejected':>10}{'mean ms':>10}")
+        for name, row in report.items():
+            print(
+                f"   {name:<16}{row['calls']:>8}{row['passed']:>8}"
+                f"{row['rejected']:>10}{row['mean_ms']:>10.2f}"
+            )
+        print("=" * 50)
+
+    def reset_statistics(self) -> None:
+        self.frames = 0
+        for stage in self.stages.values():
+            stage.statistics = StageStatistics()
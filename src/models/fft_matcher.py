@@ -0,0 +1,108 @@
+import cv2
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+from models.template_matcher import TemplateMatcher
+
+
+class FFTMatcher(TemplateMatcher):
+    """Batched normalized cross-correlation of every template in the frequency domain
+
+    Uses the same grayscale popup templates and scales as TemplateMatcher,
+    but the frame is transformed once per tick and multiplied against a
+    cached bank of template spectra, so all correlation maps come out of one
+    batched inverse transform. Window energies for the normalization come
+    from integral images, giving the same scores as TM_CCOEFF_NORMED.
+    """
+
+    def __init__(self, reference_cache, *args, **kwargs):
+        super().__init__(reference_cache, *args, **kwargs)
+        self._banks: Dict[tuple, tuple] = {}
+
+    def _get_bank(
+        self, references, frame_size: Tuple[int, int], shape: Tuple[int, int], client=None
+    ):
+        """
+        Spectra of every zero-mean template, padded to the transform shape
+        Returns (spectra, [(reference index, height, width, norm)])
+        """
+        key = (tuple(references), tuple(frame_size), shape, client)
+        bank = self._banks.get(key)
+        if bank is not None:
+            return bank
+
+        templates = []
+        entries = []
+        for index, (ref_path, roi) in enumerate(references):
+            for _, template in self._get_templates(ref_path, roi, frame_size, client):
+                centered = template.astype(np.float32)
+                centered -= centered.mean()
+                norm = float(np.sqrt(np.sum(centered * centered, dtype=np.float64)))
+                if norm == 0.0:
+                    continue
+                templates.append(centered)
+                entries.append((index, template.shape[0], template.shape[1], norm))
+
+        spectra = np.empty((len(templates), shape[0], shape[1] // 2 + 1), dtype=np.complex64)
+        for i, template in enumerate(templates):
+            spectra[i] = np.conj(np.fft.rfft2(template, s=shape))
+
+        if len(self._banks) > 8:
+            self._banks.clear()
+        self._banks[key] = (spectra, entries)
+        return spectra, entries
+
+    def match_all(
+        self,
+        frame: np.ndarray,
+        work_scale: float,
+        frame_size: Tuple[int, int],
+        references: List[Tuple[str, Optional[tuple]]],
+        client: Optional[Tuple[int, int]] = None,
+    ) -> List[Tuple[float, Optional[Tuple[int, int, int, int]]]]:
+        """
+        Match every (ref_path, roi) against a prepared frame in one batched pass
+        Returns (score, (x, y, width, height)) per reference, in frame pixels
+        """
+        height, width = frame.shape
+        shape = (cv2.getOptimalDFTSize(height), cv2.getOptimalDFTSize(width))
+        spectra, entries = self._get_bank(references, frame_size, shape, client)
+        results = [(0.0, None)] * len(references)
+        if not entries:
+            return results
+
+        pixels = frame.astype(np.float32)
+        correlations = np.fft.irfft2(
+            spectra * np.fft.rfft2(pixels, s=shape), s=shape, axes=(-2, -1)
+        )
+        sums, squares = cv2.integral2(pixels, sdepth=cv2.CV_64F, sqdepth=cv2.CV_64F)
+
+        energies = {}
+        for correlation, (index, h, w, norm) in zip(correlations, entries):
+            if h > height or w > width:
+                continue
+            energy = energies.get((h, w))
+            if energy is None:
+                # Energy of each frame window around its mean, from the integral images
+                window_sum = sums[h:, w:] - sums[:-h, w:] - sums[h:, :-w] + sums[:-h, :-w]
+                window_squares = (
+                    squares[h:, w:] - squares[:-h, w:] - squares[h:, :-w] + squares[:-h, :-w]
+                )
+                variance = np.maximum(window_squares - window_sum ** 2 / (h * w), 0.0)
+                energy = np.sqrt(variance).astype(np.float32)
+                # Flat windows (no texture) can not correlate with anything
+                energy[energy < 1e-3] = np.inf
+                energies[(h, w)] = energy
+            ncc = correlation[: height - h + 1, : width - w + 1] / energy
+            y, x = np.unravel_index(int(np.argmax(ncc)), ncc.shape)
+            score = float(ncc[y, x]) / norm
+            if score > results[index][0]:
+                results[index] = (
+                    score,
+                    (int(x / work_scale), int(y / work_scale), int(w / work_scale), int(h / work_scale)),
+                )
+        return results
+
+    def clear(self) -> None:
+        """Drop every prepared template and spectrum"""
+        super().clear()
+        self._banks.clear()
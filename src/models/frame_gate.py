@@ -0,0 +1,72 @@
+import numpy as np
+from PIL import Image
+from typing import Any, Optional, Tuple
+
+
+class FrameChangeGate:
+    """Cheap frame-difference gate placed in front of detection
+
+    Each frame is reduced to a tiny grayscale signature. When the signature
+    is within `tolerance` (mean absolute difference in gray levels) of the
+    last frame that was actually scored, the previous detection result is
+    reused. Comparing against the last scored frame rather than the previous
+    tick keeps slow drifts from accumulating unnoticed.
+    """
+
+    def __init__(
+        self,
+        tolerance: float = 2.0,
+        signature_size: Tuple[int, int] = (32, 18),
+        max_reuse: int = 10,
+    ):
+        self.tolerance = tolerance
+        self.signature_size = signature_size
+        self.max_reuse = max_reuse  # Force a full detection after this many reuses
+        self._signature: Optional[np.ndarray] = None
+        self._result: Any = None
+        self._reuse_count = 0
+
+    def signature(self, img: Image.Image, samples: int = 4) -> np.ndarray:
+        """Downsampled grayscale signature of the frame
+
+        Only a strided grid of `samples` x `samples` pixels per signature cell
+        is read (nearest-neighbour resize) and averaged, so the cost does not
+        grow with the capture resolution the way a full-frame filter does.
+        """
+        width, height = self.signature_size
+        sampled = img.resize((width * samples, height * samples), Image.Resampling.NEAREST)
+        gray = np.asarray(sampled.convert("L"), dtype=np.float32)
+        return gray.reshape(height, samples, width, samples).mean(axis=(1, 3))
+
+    def difference(self, signature: np.ndarray) -> float:
+        """Mean absolute difference against the last scored frame"""
+        if self._signature is None or self._signature.shape != signature.shape:
+            return float("inf")
+        return float(np.mean(np.abs(signature - self._signature)))
+
+    def check(self, img: Image.Image) -> Tuple[bool, Any, np.ndarray]:
+        """
+        Decide whether the frame needs detection
+        Returns (reuse, previous_result, signature)
+        """
+        signature = self.signature(img)
+        if (
+            self._result is not None
+            and self._reuse_count < self.max_reuse
+            and self.difference(signature) < self.tolerance
+        ):
+            self._reuse_count += 1
+            return True, self._result, signature
+        return False, None, signature
+
+    def store(self, signature: np.ndarray, result: Any) -> None:
+        """Remember the signature and result of a frame that was scored"""
+        self._signature = signature
+        self._result = result
+        self._reuse_count = 0
+
+    def reset(self) -> None:
+        """Forget the last scored frame"""
+        self._signature = None
+        self._result = None
+        self._reuse_count = 0
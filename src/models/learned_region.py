@@ -0,0 +1,78 @@
+from collections import deque
+from typing import Optional, Tuple
+
+
+class LearnedSearchRegion:
+    """Where one reference's popup actually appears on this installation
+
+    Matched locations of a reference in the position-tolerant engines are
+    kept normalized to the frame size. Once `min_matches` were recorded,
+    `search_box` returns their union grown by `margin` (a fraction of the
+    frame), so only that part of the frame is searched for the reference.
+    The whole frame is still searched every `full_search_interval` frames
+    and after `miss_limit` narrowed frames in a row found nothing, so a
+    popup that moved is learned again.
+    """
+
+    def __init__(
+        self,
+        min_matches: int = 3,
+        margin: float = 0.05,
+        full_search_interval: int = 30,
+        miss_limit: int = 10,
+        max_length: int = 20,
+    ):
+        self.min_matches = min_matches
+        self.margin = margin
+        self.full_search_interval = full_search_interval
+        self.miss_limit = miss_limit
+        self._locations = deque(maxlen=max_length)
+        self._narrowed = 0  # Narrowed frames since the last full search
+        self._misses = 0  # Narrowed frames in a row without a match
+
+    def search_box(self, frame_size: Tuple[int, int]) -> Optional[Tuple[int, int, int, int]]:
+        """
+        (left, top, right, bottom) pixels to search in the next frame
+        Returns None when the whole frame should be searched
+        """
+        if len(self._locations) < self.min_matches:
+            return None
+        if self._narrowed >= self.full_search_interval or self._misses >= self.miss_limit:
+            self._narrowed = 0
+            self._misses = 0
+            return None
+
+        left = max(min(box[0] for box in self._locations) - self.margin, 0.0)
+        top = max(min(box[1] for box in self._locations) - self.margin, 0.0)
+        right = min(max(box[2] for box in self._locations) + self.margin, 1.0)
+        bottom = min(max(box[3] for box in self._locations) + self.margin, 1.0)
+        width, height = frame_size
+        self._narrowed += 1
+        return (
+            int(left * width),
+            int(top * height),
+            int(round(right * width)),
+            int(round(bottom * height)),
+        )
+
+    def record(
+        self,
+        location: Optional[Tuple[int, int, int, int]],
+        frame_size: Tuple[int, int],
+        narrowed: bool,
+    ) -> None:
+        """Record the (x, y, width, height) of a frame's match, or None when nothing matched"""
+        if location is None:
+            if narrowed:
+                self._misses += 1
+            return
+        self._misses = 0
+        x, y, w, h = location
+        width, height = frame_size
+        self._locations.append((x / width, y / height, (x + w) / width, (y + h) / height))
+
+    def clear(self) -> None:
+        """Forget every learned location"""
+        self._locations.clear()
+        self._narrowed = 0
+        self._misses = 0
@@ -0,0 +1,113 @@
+import re
+import hashlib
+import logging
+import numpy as np
+from collections import OrderedDict
+from difflib import SequenceMatcher
+from PIL import Image, ImageOps
+from typing import NamedTuple, Optional, Tuple
+from models.reference_cache import roi_to_box
+
+try:
+    import pytesseract
+except Exception:
+    pytesseract = None
+
+
+class OCRTarget(NamedTuple):
+    """Text expected in a small popup region, e.g. the accept button or title"""
+
+    roi: Tuple[float, float, float, float]  # Normalized (x, y, width, height)
+    keywords: Tuple[str, ...]  # Accepted spellings, one per client language
+
+
+def normalize_text(text: str) -> str:
+    """Upper-case words separated by single spaces, punctuation removed"""
+    return " ".join(re.findall(r"\w+", text.upper()))
+
+
+def text_score(text: str, keywords: Tuple[str, ...]) -> float:
+    """Best similarity in [0, 1] between the read text and any keyword"""
+    words = normalize_text(text).split()
+    best = 0.0
+    for keyword in keywords:
+        keyword = normalize_text(keyword)
+        length = len(keyword.split())
+        if not keyword or not words:
+            continue
+        # Compare against every run of as many words as the keyword has
+        for start in range(max(len(words) - length, 0) + 1):
+            candidate = " ".join(words[start : start + length])
+            best = max(best, SequenceMatcher(None, candidate, keyword).ratio())
+    return best
+
+
+class OCRReader:
+    """Tesseract reads of small frame regions behind a pixel-hash LRU cache
+
+    Regions are hashed after the grayscale conversion, so Tesseract only
+    runs when the pixels under a region actually change; the popup button
+    and title stay static while the popup is up.
+    """
+
+    def __init__(self, cache: OrderedDict, max_entries: int = 64, languages: str = "eng"):
+        self.logger = logging.getLogger("Dota2AutoAccept.OCRReader")
+        self.cache = cache
+        self.max_entries = max_entries
+        self.languages = languages
+        self._available: Optional[bool] = None
+
+    def available(self) -> bool:
+        """Whether pytesseract and the Tesseract executable can be used"""
+        if self._available is None:
+            if pytesseract is None:
+                print("⚠️ pytesseract is not installed, OCR fallback disabled")
+                self._available = False
+            else:
+                try:
+                    pytesseract.get_tesseract_version()
+                    self._available = True
+                except Exception as e:
+                    print(f"⚠️ Tesseract not found, OCR fallback disabled: {e}")
+                    self._available = False
+        return self._available
+
+    def read(self, img: Image.Image, roi: Tuple[float, float, float, float]) -> str:
+        """Text in a normalized region of the frame, from the cache when unchanged"""
+        region = img.crop(roi_to_box(roi, img.size)).convert("L")
+        pixels = np.asarray(region)
+        # Reads depend on the Tesseract languages as well as on the pixels
+        key = (
+            self.languages,
+            pixels.shape,
+            hashlib.blake2b(pixels.tobytes(), digest_size=16).digest(),
+        )
+        text = self.cache.get(key)
+        if text is not None:
+            self.cache.move_to_end(key)
+            return text
+
+        text = self._recognize(region)
+        self.cache[key] = text
+        while len(self.cache) > self.max_entries:
+            self.cache.popitem(last=False)
+        return text
+
+    def _recognize(self, region: Image.Image) -> str:
+        # Tesseract reads dark text on a light background best, at about 30 px per line
+        if region.height < 48:
+            factor = 48 / region.height
+            region = region.resize(
+                (int(region.width * factor), 48), Image.Resampling.LANCZOS
+            )
+        region = ImageOps.autocontrast(region)
+        if np.asarray(region).mean() < 128:
+            region = ImageOps.invert(region)
+        try:
+            return pytesseract.image_to_string(region, lang=self.languages, config="--psm 7")
+        except Exception as e:
+            self.logger.warning(f"OCR failed: {e}")
+            return ""
+
+    def clear(self) -> None:
+        self.cache.clear()
@@ -0,0 +1,15 @@
+import numpy as np
+from PIL import Image
+
+
+def dhash(img: Image.Image, hash_size: int = 8) -> int:
+    """Difference hash: sign of horizontal gradients on a tiny grayscale image"""
+    small = img.convert("L").resize((hash_size + 1, hash_size), Image.Resampling.BOX)
+    pixels = np.asarray(small, dtype=np.int16)
+    bits = (pixels[:, 1:] > pixels[:, :-1]).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """Number of differing bits between two hashes"""
+    return bin(a ^ b).count("1")
@@ -0,0 +1,110 @@
+import os
+import logging
+import numpy as np
+from PIL import Image
+from typing import Dict, List, Optional, Tuple
+from models.reference_cache import roi_to_box
+
+CLASSIFIER_VERSION = 1
+NONE_LABEL = "none"
+
+# Region covering every shipped popup and the size it is reduced to
+FEATURE_ROI = (0.25, 0.10, 0.50, 0.65)
+FEATURE_SIZE = (40, 26)
+
+
+def frame_features(
+    img: Image.Image,
+    roi: Tuple[float, float, float, float] = FEATURE_ROI,
+    size: Tuple[int, int] = FEATURE_SIZE,
+) -> np.ndarray:
+    """Flattened RGB thumbnail of the popup area, scaled to [0, 1]"""
+    # reducing_gap shrinks by an integer factor first, so this stays under a millisecond
+    thumbnail = img.resize(
+        size, Image.Resampling.BILINEAR, box=roi_to_box(roi, img.size), reducing_gap=2.0
+    )
+    if thumbnail.mode != "RGB":
+        thumbnail = thumbnail.convert("RGB")
+    return np.asarray(thumbnail, dtype=np.float32).reshape(-1) / 255.0
+
+
+class PopupClassifier:
+    """Softmax regression over downsampled frames, trained offline
+
+    Produced by tools/train_classifier.py. Inference is one standardization
+    and one matrix-vector product, giving a probability per label (the
+    reference names plus "none").
+    """
+
+    def __init__(
+        self,
+        labels: List[str],
+        weights: np.ndarray,
+        bias: np.ndarray,
+        mean: np.ndarray,
+        scale: np.ndarray,
+        roi: Tuple[float, float, float, float] = FEATURE_ROI,
+        size: Tuple[int, int] = FEATURE_SIZE,
+    ):
+        self.labels = list(labels)
+        self.weights = np.ascontiguousarray(weights, dtype=np.float32)  # (classes, features)
+        self.bias = np.asarray(bias, dtype=np.float32)
+        self.mean = np.asarray(mean, dtype=np.float32)
+        self.scale = np.asarray(scale, dtype=np.float32)
+        self.roi = tuple(roi)
+        self.size = tuple(size)
+        # Standardization folded into the weights, so inference is a single product
+        self._weights = np.ascontiguousarray(self.weights / self.scale)
+        self._bias = self.bias - self._weights @ self.mean
+
+    def features(self, img: Image.Image) -> np.ndarray:
+        return frame_features(img, self.roi, self.size)
+
+    def probabilities(self, features: np.ndarray) -> np.ndarray:
+        """Class probabilities of one feature vector or a (samples, features) matrix"""
+        logits = features @ self._weights.T + self._bias
+        logits -= logits.max(axis=-1, keepdims=True)
+        exp = np.exp(logits)
+        return exp / exp.sum(axis=-1, keepdims=True)
+
+    def predict(self, img: Image.Image) -> Dict[str, float]:
+        """Probability of every label for a frame"""
+        probabilities = self.probabilities(self.features(img))
+        return {label: float(p) for label, p in zip(self.labels, probabilities)}
+
+    def save(self, path: str) -> None:
+        np.savez(
+            path,
+            version=CLASSIFIER_VERSION,
+            labels=np.array(self.labels),
+            weights=self.weights,
+            bias=self.bias,
+            mean=self.mean,
+            scale=self.scale,
+            roi=np.array(self.roi),
+            size=np.array(self.size),
+        )
+
+    @classmethod
+    def load(cls, path: str) -> Optional["PopupClassifier"]:
+        """Load a trained model, or return None when it is missing or incompatible"""
+        logger = logging.getLogger("Dota2AutoAccept.PopupClassifier")
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path) as data:
+                if int(data["version"]) != CLASSIFIER_VERSION:
+                    logger.warning(f"Unsupported classifier version in {path}")
+                    return None
+                return cls(
+                    [str(label) for label in data["labels"]],
+                    data["weights"],
+                    data["bias"],
+                    data["mean"],
+                    data["scale"],
+                    tuple(float(v) for v in data["roi"]),
+                    tuple(int(v) for v in data["size"]),
+                )
+        except Exception as e:
+            logger.warning(f"Failed to load classifier {path}: {e}")
+            return None
@@ -0,0 +1,69 @@
+from typing import Optional, Tuple
+from models.reference_cache import region_size
+
+FULL_ROI = (0.0, 0.0, 1.0, 1.0)
+
+
+def client_size(client: Tuple[int, int, int, int]) -> Tuple[int, int]:
+    """(width, height) of a (left, top, right, bottom) client rectangle"""
+    return client[2] - client[0], client[3] - client[1]
+
+
+def popup_scale(reference_size: Tuple[int, int], client: Tuple[int, int]) -> float:
+    """How much larger the popup is in the client than in the reference screenshot
+
+    `client` is the (width, height) of the game's client area. Dota's UI
+    scales with the window height, so wider windows only add margins on both
+    sides; a narrower window limits the UI by its width.
+    """
+    return min(client[0] / reference_size[0], client[1] / reference_size[1])
+
+
+def frame_roi(
+    roi: Optional[Tuple[float, float, float, float]],
+    reference_size: Tuple[int, int],
+    frame_size: Tuple[int, int],
+    client: Optional[Tuple[int, int, int, int]] = None,
+) -> Tuple[float, float, float, float]:
+    """Map a reference-normalized ROI to the same popup area of a frame
+
+    The reference screen is scaled by `popup_scale` and centred in the
+    client rectangle (left, top, right, bottom) in frame pixels, the whole
+    frame when None, so the ROI keeps the popup's aspect ratio on 21:9 and
+    32:9 screens and follows a windowed client.
+    """
+    x, y, w, h = roi if roi is not None else FULL_ROI
+    left, top, right, bottom = client if client is not None else (0, 0, *frame_size)
+    ref_width, ref_height = reference_size
+    frame_width, frame_height = frame_size
+    scale = popup_scale(reference_size, (right - left, bottom - top))
+    # Reference pixels -> frame pixels, around the client's centre
+    center_x = (left + right) / 2
+    center_y = (top + bottom) / 2
+    return (
+        (center_x + (x - 0.5) * ref_width * scale) / frame_width,
+        (center_y + (y - 0.5) * ref_height * scale) / frame_height,
+        w * ref_width * scale / frame_width,
+        h * ref_height * scale / frame_height,
+    )
+
+
+def scoring_scale(reference_size: Tuple[int, int], client: Tuple[int, int]) -> float:
+    """Downsample factor that brings the client's popup to the reference's pixel size"""
+    return min(1.0, 1.0 / popup_scale(reference_size, client))
+
+
+def scoring_size(
+    roi: Optional[Tuple[float, float, float, float]],
+    reference_size: Tuple[int, int],
+    frame_size: Tuple[int, int],
+    scale: float = 1.0,
+    client: Optional[Tuple[int, int, int, int]] = None,
+) -> Tuple[int, int]:
+    """Pixel size a reference region is prepared and scored at for a frame and client"""
+    client = client if client is not None else (0, 0, *frame_size)
+    return region_size(
+        frame_roi(roi, reference_size, frame_size, client),
+        frame_size,
+        scale * scoring_scale(reference_size, client_size(client)),
+    )
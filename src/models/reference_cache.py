@@ -0,0 +1,246 @@
+import os
+import logging
+import threading
+import numpy as np
+from PIL import Image
+from typing import Dict, Optional, Tuple
+from models.ssim_scorer import SSIMStatistics, compute_statistics
+
+
+class ReferenceCache:
+    """Cache of decoded reference images and ready-to-compare arrays
+
+    Each reference file is decoded from disk once. Cropped and resized copies
+    are stored as NumPy arrays keyed by (reference, region, target size,
+    colour mode) and are evicted whenever the capture geometry changes.
+    When a reference pack is attached, prepared arrays are taken from it
+    instead of being decoded and resized.
+    """
+
+    def __init__(self):
+        self.logger = logging.getLogger("Dota2AutoAccept.ReferenceCache")
+        self._lock = threading.Lock()
+        self._decoded: Dict[str, Image.Image] = {}
+        self._sizes: Dict[str, Tuple[int, int]] = {}
+        self._prepared: Dict[tuple, np.ndarray] = {}
+        self._geometry: Optional[tuple] = None  # (capture size, client rectangle)
+        self._pack = None
+
+    def attach_pack(self, pack) -> None:
+        """Serve prepared arrays and statistics from a precompiled reference pack"""
+        with self._lock:
+            self._pack = pack
+
+    def preload(self, paths) -> None:
+        """Decode every reference path up front so the first tick pays no I/O"""
+        for path in paths:
+            self.get_decoded(path)
+
+    def get_decoded(self, path: str) -> Optional[Image.Image]:
+        """Return the decoded reference image, reading it from disk only once"""
+        with self._lock:
+            image = self._decoded.get(path)
+        if image is not None:
+            return image
+        if not os.path.exists(path):
+            return None
+        try:
+            with Image.open(path) as opened:
+                opened.load()
+                image = opened.copy()
+        except Exception as e:
+            self.logger.warning(f"Failed to decode reference {path}: {e}")
+            return None
+        with self._lock:
+            self._decoded[path] = image
+        return image
+
+    def get_size(self, path: str) -> Optional[Tuple[int, int]]:
+        """Return the reference's (width, height), reading only the file header"""
+        with self._lock:
+            size = self._sizes.get(path)
+            image = self._decoded.get(path)
+        if size is not None:
+            return size
+        if image is not None:
+            size = image.size
+        else:
+            try:
+                with Image.open(path) as opened:
+                    size = opened.size
+            except Exception:
+                return None
+        with self._lock:
+            self._sizes[path] = size
+        return size
+
+    def get_array(
+        self,
+        path: str,
+        size: Tuple[int, int],
+        mode: str = "RGB",
+        roi: Optional[Tuple[float, float, float, float]] = None,
+    ) -> Optional[np.ndarray]:
+        """Return the reference cropped to `roi`, resized to `size` and converted to `mode`
+
+        `roi` is a normalized (x, y, width, height) box; None means the whole image.
+        """
+        key = (path, roi, tuple(size), mode)
+        with self._lock:
+            array = self._prepared.get(key)
+        if array is not None:
+            return array
+        if self._pack is not None:
+            array = self._pack.get_array(path, size, mode, roi)
+            if array is not None:
+                return array
+
+        image = self.get_decoded(path)
+        if image is None:
+            return None
+        if roi is not None:
+            image = image.crop(roi_to_box(roi, image.size))
+        if image.size != tuple(size):
+            image = image.resize(tuple(size), Image.Resampling.LANCZOS)
+        if image.mode != mode:
+            image = image.convert(mode)
+        array = np.asarray(image)
+        if array.ndim == 2:
+            # Single-channel modes keep a channel axis like the frame crops
+            array = array[:, :, np.newaxis]
+        array = np.ascontiguousarray(array)
+        array.setflags(write=False)
+
+        with self._lock:
+            self._prepared[key] = array
+        return array
+
+    def get_stack(
+        self,
+        paths,
+        size: Tuple[int, int],
+        mode: str = "RGB",
+        roi: Optional[Tuple[float, float, float, float]] = None,
+    ) -> Optional[np.ndarray]:
+        """Return the prepared references stacked into one contiguous (N, H, W, C) array"""
+        paths = tuple(paths)
+        key = ("stack", paths, roi, tuple(size), mode)
+        with self._lock:
+            stack = self._prepared.get(key)
+        if stack is not None:
+            return stack
+
+        arrays = [self.get_array(path, size, mode, roi) for path in paths]
+        if any(array is None for array in arrays):
+            return None
+        stack = np.ascontiguousarray(np.stack(arrays))
+        stack.setflags(write=False)
+
+        with self._lock:
+            self._prepared[key] = stack
+        return stack
+
+    def get_statistics(
+        self,
+        paths,
+        size: Tuple[int, int],
+        mode: str = "RGB",
+        roi: Optional[Tuple[float, float, float, float]] = None,
+        ignore=None,
+    ) -> Optional[SSIMStatistics]:
+        """Return precomputed SSIM mean and variance maps of the stacked references
+
+        `ignore` holds, per path, normalized (x, y, width, height) frame boxes
+        whose pixels are left out of the score through the statistics' weights.
+        """
+        paths = tuple(paths)
+        ignore = tuple(tuple(boxes) for boxes in ignore) if ignore and any(ignore) else None
+        key = ("statistics", paths, roi, tuple(size), mode, ignore)
+        with self._lock:
+            statistics = self._prepared.get(key)
+        if statistics is not None:
+            return statistics
+
+        if self._pack is not None and len(paths) == 1:
+            statistics = self._pack.get_statistics(paths[0], size, mode, roi)
+        if statistics is None:
+            stack = self.get_stack(paths, size, mode, roi)
+            if stack is None:
+                return None
+            statistics = compute_statistics(stack)
+        if ignore is not None:
+            weights = np.stack([ignore_weights(roi, size, boxes) for boxes in ignore])
+            weights.setflags(write=False)
+            statistics = statistics._replace(weights=weights)
+
+        with self._lock:
+            self._prepared[key] = statistics
+        return statistics
+
+    def set_geometry(
+        self, size: Tuple[int, int], client: Optional[Tuple[int, int, int, int]] = None
+    ) -> None:
+        """Evict prepared arrays when the capture size or the client rectangle changes"""
+        geometry = (tuple(size), tuple(client) if client is not None else None)
+        with self._lock:
+            if self._geometry == geometry:
+                return
+            if self._geometry is not None:
+                self.logger.info(
+                    f"Capture geometry changed {self._geometry} -> {geometry}, "
+                    f"evicting {len(self._prepared)} prepared references"
+                )
+            self._geometry = geometry
+            self._prepared.clear()
+
+    def clear(self) -> None:
+        """Drop every decoded and prepared entry"""
+        with self._lock:
+            self._decoded.clear()
+            self._sizes.clear()
+            self._prepared.clear()
+            self._geometry = None
+
+
+def roi_to_box(
+    roi: Tuple[float, float, float, float], size: Tuple[int, int]
+) -> Tuple[int, int, int, int]:
+    """Convert a normalized (x, y, width, height) ROI to a pixel crop box"""
+    width, height = size
+    x, y, w, h = roi
+    left = min(max(int(round(x * width)), 0), width - 1)
+    top = min(max(int(round(y * height)), 0), height - 1)
+    right = min(max(int(round((x + w) * width)), left + 1), width)
+    bottom = min(max(int(round((y + h) * height)), top + 1), height)
+    return left, top, right, bottom
+
+
+def ignore_weights(
+    roi: Optional[Tuple[float, float, float, float]], size: Tuple[int, int], boxes
+) -> np.ndarray:
+    """(H, W) float32 weights of a prepared region, 0 inside the ignored frame boxes"""
+    width, height = size
+    roi_x, roi_y, roi_w, roi_h = roi if roi is not None else (0.0, 0.0, 1.0, 1.0)
+    weights = np.ones((height, width), dtype=np.float32)
+    for x, y, w, h in boxes:
+        # Frame-normalized box to pixels of the region prepared at `size`
+        left = int(round((x - roi_x) / roi_w * width))
+        top = int(round((y - roi_y) / roi_h * height))
+        right = int(round((x + w - roi_x) / roi_w * width))
+        bottom = int(round((y + h - roi_y) / roi_h * height))
+        weights[max(top, 0) : max(bottom, 0), max(left, 0) : max(right, 0)] = 0.0
+    return weights
+
+
+def region_size(
+    roi: Optional[Tuple[float, float, float, float]],
+    size: Tuple[int, int],
+    scale: float = 1.0,
+) -> Tuple[int, int]:
+    """Pixel size of a frame's region of interest, optionally downsampled"""
+    if roi is not None:
+        left, top, right, bottom = roi_to_box(roi, size)
+        size = (right - left, bottom - top)
+    if scale == 1.0:
+        return tuple(size)
+    return max(int(size[0] * scale), 7), max(int(size[1] * scale), 7)
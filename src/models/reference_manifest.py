@@ -0,0 +1,97 @@
+import os
+import json
+import logging
+from typing import Dict, NamedTuple, Optional, Tuple
+from models.color_signature import ColorSignature
+from models.ocr_reader import OCRTarget
+
+MANIFEST_FILE = "references.json"
+
+# Actions process_detection_result knows how to perform
+ACTIONS = ("match_detected", "read_check_detected", "ad_detected", "none")
+COLOR_MODES = ("RGB", "L")
+
+
+class ReferenceSpec(NamedTuple):
+    """One manifest entry: a reference image and how to detect and act on it"""
+
+    name: str
+    path: str
+    roi: Optional[Tuple[float, float, float, float]]  # Normalized (x, y, width, height)
+    color_mode: str
+    threshold: Optional[float]  # None uses the global detection threshold
+    action: str
+    signature: Optional[ColorSignature] = None  # Cheap colour check run before scoring
+    ignore: Tuple[Tuple[float, float, float, float], ...] = ()  # Frame boxes left out of SSIM
+    ocr: Optional[OCRTarget] = None  # Text read by the OCR fallback
+
+
+def _parse_signature(entry: Optional[dict]) -> Optional[ColorSignature]:
+    if entry is None:
+        return None
+    roi = tuple(float(value) for value in entry["roi"])
+    lower = tuple(int(value) for value in entry["lower"])
+    upper = tuple(int(value) for value in entry["upper"])
+    if len(roi) != 4 or len(lower) != 3 or len(upper) != 3:
+        raise ValueError("signature needs a 4-value roi and 3-value lower/upper RGB bounds")
+    return ColorSignature(roi, lower, upper, float(entry.get("min_fraction", 0.4)))
+
+
+def _parse_ocr(entry: Optional[dict]) -> Optional[OCRTarget]:
+    if entry is None:
+        return None
+    roi = tuple(float(value) for value in entry["roi"])
+    keywords = tuple(str(keyword) for keyword in entry["keywords"])
+    if len(roi) != 4 or not keywords:
+        raise ValueError("ocr needs a 4-value roi and at least one keyword")
+    return OCRTarget(roi, keywords)
+
+
+def _parse_ignore(entries) -> Tuple[Tuple[float, float, float, float], ...]:
+    boxes = tuple(tuple(float(value) for value in box) for box in entries or ())
+    if any(len(box) != 4 for box in boxes):
+        raise ValueError("ignore boxes must have 4 values each")
+    return boxes
+
+
+def load_reference_manifest(base_path: str) -> Dict[str, ReferenceSpec]:
+    """Parse bin/references.json into an ordered name -> ReferenceSpec index"""
+    logger = logging.getLogger("Dota2AutoAccept.ReferenceManifest")
+    manifest_path = os.path.join(base_path, MANIFEST_FILE)
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except Exception as e:
+        print(f"⚠️ Reference manifest could not be loaded: {manifest_path} ({e})")
+        return {}
+
+    references = {}
+    for entry in data.get("references", []):
+        try:
+            name = entry["name"]
+            roi = entry.get("roi")
+            if roi is not None:
+                roi = tuple(float(value) for value in roi)
+                if len(roi) != 4:
+                    raise ValueError(f"roi must have 4 values, got {len(roi)}")
+            color_mode = entry.get("color_mode", "RGB")
+            if color_mode not in COLOR_MODES:
+                raise ValueError(f"unknown color_mode {color_mode!r}")
+            action = entry.get("action", "none")
+            if action not in ACTIONS:
+                raise ValueError(f"unknown action {action!r}")
+            threshold = entry.get("threshold")
+            references[name] = ReferenceSpec(
+                name=name,
+                path=os.path.join(base_path, entry["image"]),
+                roi=roi,
+                color_mode=color_mode,
+                threshold=float(threshold) if threshold is not None else None,
+                action=action,
+                signature=_parse_signature(entry.get("signature")),
+                ignore=_parse_ignore(entry.get("ignore")),
+                ocr=_parse_ocr(entry.get("ocr")),
+            )
+        except Exception as e:
+            logger.warning(f"Skipping invalid manifest entry {entry!r}: {e}")
+    return references
@@ -0,0 +1,237 @@
+import os
+import json
+import struct
+import hashlib
+import logging
+import numpy as np
+from typing import Dict, Iterable, Optional, Tuple
+from models.perceptual_hash import dhash
+from models.reference_cache import roi_to_box
+from models.popup_geometry import scoring_size
+from models.ssim_scorer import SSIMStatistics, compute_statistics
+
+PACK_FILE = "reference_pack.bin"
+PACK_MAGIC = b"D2AAPACK"
+PACK_VERSION = 2
+PACK_ALIGNMENT = 64
+
+# Capture sizes prepared ahead of time: 1080p, 1440p, 2160p and 21:9 ultrawide
+PACK_RESOLUTIONS = ((1920, 1080), (2560, 1440), (3840, 2160), (3440, 1440))
+
+_PREAMBLE = struct.Struct("<8sII")  # magic, version, header length
+
+logger = logging.getLogger("Dota2AutoAccept.ReferencePack")
+
+
+def _entry_key(path: str, roi, size: Tuple[int, int], mode: str) -> str:
+    roi_text = "full" if roi is None else ",".join(f"{v:.6f}" for v in roi)
+    return f"{os.path.basename(path)}|{roi_text}|{size[0]}x{size[1]}|{mode}"
+
+
+def _aligned(length: int) -> int:
+    return -(-length // PACK_ALIGNMENT) * PACK_ALIGNMENT
+
+
+def source_checksums(references) -> Dict[str, str]:
+    """SHA-256 of each source image together with the settings it is prepared with"""
+    checksums = {}
+    for name, spec in references.items():
+        try:
+            with open(spec.path, "rb") as f:
+                digest = hashlib.sha256(f.read())
+        except OSError:
+            continue
+        digest.update(repr((spec.roi, spec.color_mode)).encode())
+        checksums[name] = digest.hexdigest()
+    return checksums
+
+
+class ReferencePack:
+    """Precompiled reference arrays read straight from a memory-mapped file
+
+    The file starts with a small JSON header (version, source checksums,
+    reference hashes and sizes, and an index of array offsets) followed by
+    the raw arrays. Arrays handed out are read-only views into the mapping, so
+    loading the pack costs neither decoding nor resizing.
+    """
+
+    def __init__(self, path: str, header: dict, data: np.memmap):
+        self.path = path
+        self.header = header
+        self._data = data
+        self._index = header["arrays"]
+        # Array offsets are relative to the aligned start of the data section
+        self._data_start = _aligned(_PREAMBLE.size + header["length"])
+
+    @property
+    def checksums(self) -> Dict[str, str]:
+        return self.header["checksums"]
+
+    @property
+    def hashes(self) -> Dict[str, int]:
+        return {name: int(value, 16) for name, value in self.header["hashes"].items()}
+
+    @classmethod
+    def load(cls, path: str) -> Optional["ReferencePack"]:
+        """Map a pack file, or return None when it is missing or from another version"""
+        try:
+            with open(path, "rb") as f:
+                magic, version, header_length = _PREAMBLE.unpack(f.read(_PREAMBLE.size))
+                if magic != PACK_MAGIC or version != PACK_VERSION:
+                    return None
+                header = json.loads(f.read(header_length).decode("utf-8"))
+                header["length"] = header_length
+            data = np.memmap(path, dtype=np.uint8, mode="r")
+        except (OSError, ValueError, struct.error) as e:
+            logger.debug(f"Could not load reference pack {path}: {e}")
+            return None
+        return cls(path, header, data)
+
+    def is_current(self, references, scales: Iterable[float] = (1.0,)) -> bool:
+        """Whether the pack matches the source images and holds every requested scale"""
+        if self.checksums != source_checksums(references):
+            return False
+        sizes = self.header.get("sizes", {})
+        for name, spec in references.items():
+            if not os.path.exists(spec.path):
+                continue
+            if name not in sizes:
+                return False
+            for resolution in PACK_RESOLUTIONS:
+                for scale in scales:
+                    size = scoring_size(spec.roi, tuple(sizes[name]), resolution, scale)
+                    key = _entry_key(spec.path, spec.roi, size, spec.color_mode)
+                    if key + "|values" not in self._index:
+                        return False
+        return True
+
+    def _array(self, key: str) -> Optional[np.ndarray]:
+        entry = self._index.get(key)
+        if entry is None:
+            return None
+        return np.ndarray(
+            tuple(entry["shape"]),
+            dtype=np.dtype(entry["dtype"]),
+            buffer=self._data,
+            offset=self._data_start + entry["offset"],
+        )
+
+    def get_array(self, path: str, size, mode: str = "RGB", roi=None) -> Optional[np.ndarray]:
+        """Prepared (H, W, C) reference region, if the pack holds this size"""
+        return self._array(_entry_key(path, roi, size, mode) + "|values")
+
+    def get_statistics(self, path: str, size, mode: str = "RGB", roi=None) -> Optional[SSIMStatistics]:
+        """SSIM statistics of a single reference, if the pack holds them"""
+        key = _entry_key(path, roi, size, mode)
+        mean = self._array(key + "|mean")
+        variance = self._array(key + "|variance")
+        values = self.get_array(path, size, mode, roi)
+        if mean is None or variance is None or values is None:
+            return None
+        # Statistics are only packed for small levels, so this copy is cheap
+        return SSIMStatistics(values[np.newaxis].astype(np.float32), mean, variance)
+
+    def close(self) -> None:
+        mmap = getattr(self._data, "_mmap", None)
+        self._data = None
+        if mmap is not None:
+            mmap.close()
+
+
+def build_reference_pack(
+    path: str,
+    references,
+    reference_cache,
+    scales: Iterable[float] = (1.0,),
+    statistics_scales: Iterable[float] = (),
+    resolutions=PACK_RESOLUTIONS,
+) -> bool:
+    """
+    Prepare every reference at each resolution and scale and write the pack
+
+    Full-resolution SSIM statistics are several times the size of the image
+    data, so they are stored only for `statistics_scales` (the coarse pyramid
+    level); other levels get their statistics computed on first use.
+    """
+    statistics_scales = set(statistics_scales)
+    arrays = []
+    prepared = set()
+    hashes = {}
+    sizes = {}
+    for name, spec in references.items():
+        reference = reference_cache.get_decoded(spec.path)
+        if reference is None:
+            continue
+        sizes[name] = list(reference.size)
+        region = reference.crop(roi_to_box(spec.roi, reference.size)) if spec.roi else reference
+        hashes[name] = format(dhash(region), "x")
+        for resolution in resolutions:
+            for scale in scales:
+                size = scoring_size(spec.roi, reference.size, resolution, scale)
+                key = _entry_key(spec.path, spec.roi, size, spec.color_mode)
+                if key in prepared:
+                    continue
+                prepared.add(key)
+                values = reference_cache.get_array(spec.path, size, spec.color_mode, spec.roi)
+                arrays.append((key + "|values", values))
+                if scale in statistics_scales:
+                    statistics = compute_statistics(values)
+                    arrays.append((key + "|mean", statistics.mean))
+                    arrays.append((key + "|variance", statistics.variance))
+
+    index = {}
+    offset = 0
+    for key, array in arrays:
+        index[key] = {"shape": list(array.shape), "dtype": array.dtype.str, "offset": offset}
+        offset += _aligned(array.nbytes)
+
+    header = {
+        "checksums": source_checksums(references),
+        "hashes": hashes,
+        "sizes": sizes,
+        "resolutions": [list(r) for r in resolutions],
+        "arrays": index,
+    }
+    header_bytes = json.dumps(header).encode("utf-8")
+    padding = _aligned(_PREAMBLE.size + len(header_bytes)) - _PREAMBLE.size - len(header_bytes)
+    header_bytes += b" " * padding
+
+    temp_path = path + ".tmp"
+    try:
+        with open(temp_path, "wb") as f:
+            f.write(_PREAMBLE.pack(PACK_MAGIC, PACK_VERSION, len(header_bytes)))
+            f.write(header_bytes)
+            for key, array in arrays:
+                data = np.ascontiguousarray(array).tobytes()
+                f.write(data)
+                f.write(b"\0" * (-len(data) % PACK_ALIGNMENT))
+        os.replace(temp_path, path)
+    except OSError as e:
+        logger.warning(f"Could not write reference pack {path}: {e}")
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        return False
+    logger.info(f"Reference pack written to {path} ({len(arrays)} arrays)")
+    return True
+
+
+def load_or_build_reference_pack(
+    path: str,
+    references,
+    reference_cache,
+    scales: Iterable[float] = (1.0,),
+    statistics_scales: Iterable[float] = (),
+) -> Optional[ReferencePack]:
+    """Load the pack, rebuilding it first when a source image or its settings changed"""
+    scales = tuple(scales)
+    pack = ReferencePack.load(path)
+    if pack is not None:
+        if pack.is_current(references, scales):
+            return pack
+        logger.info("Reference images changed, rebuilding the reference pack")
+        pack.close()
+    if not build_reference_pack(path, references, reference_cache, scales, statistics_scales):
+        return None
+    return ReferencePack.load(path)
@@ -14,6 +14,7 @@ class ScreenshotModel:
         self.logger = logging.getLogger("Dota2AutoAccept.ScreenshotModel")
         self.latest_screenshot_img = None
         self.latest_screenshot_time = None
+        self.latest_monitor = None  # mss monitor of the last capture (left, top, width, height)
         
         # Clean up old screenshots on startup
         self.cleanup_old_screenshots()
@@ -66,6 +67,7 @@ class ScreenshotModel:
                 img = Image.frombytes('RGB', sct_img.size, sct_img.rgb)
                 self.latest_screenshot_time = datetime.datetime.now()
                 self.latest_screenshot_img = img.copy()
+                self.latest_monitor = dict(monitor)
                 if show_debug:
                     print(f"✅ Screenshot captured successfully from Monitor {monitor_index}")
                 return img
@@ -0,0 +1,144 @@
+import cv2
+import numpy as np
+from typing import NamedTuple, Optional
+
+
+class SSIMStatistics(NamedTuple):
+    """Float32 (N, H, W, C) image stack with its local mean and variance maps"""
+
+    values: np.ndarray
+    mean: np.ndarray
+    variance: np.ndarray
+    weights: Optional[np.ndarray] = None  # (N, H, W) pixel weights, 0 where ignored
+
+
+def _box(images: np.ndarray, win_size: int) -> np.ndarray:
+    """Normalized box filter of every image in a stack
+
+    Uses the same reflected border as skimage's uniform filter.
+    """
+    out = np.empty_like(images)
+    for i in range(images.shape[0]):
+        cv2.boxFilter(
+            images[i],
+            -1,
+            (win_size, win_size),
+            dst=out[i],
+            normalize=True,
+            borderType=cv2.BORDER_REFLECT,
+        )
+    return out
+
+
+def compute_statistics(images: np.ndarray, win_size: int = 7) -> SSIMStatistics:
+    """
+    Local statistics of an (H, W, C) image or an (N, H, W, C) stack for SSIM
+
+    References compute these once when they are prepared, so each tick only
+    pays for the frame's statistics and the cross term.
+    """
+    values = images if images.ndim == 4 else images[np.newaxis]
+    values = np.ascontiguousarray(values, dtype=np.float32)
+    n_pixels = win_size ** 2
+    cov_norm = n_pixels / (n_pixels - 1)
+    mean = _box(values, win_size)
+    variance = _box(values * values, win_size)
+    variance -= mean * mean
+    variance *= cov_norm
+    for array in (values, mean, variance):
+        array.setflags(write=False)
+    return SSIMStatistics(values, mean, variance)
+
+
+def ssim_map(
+    frame: SSIMStatistics,
+    references: SSIMStatistics,
+    win_size: int = 7,
+    data_range: float = 255.0,
+) -> np.ndarray:
+    """
+    Per-pixel colour SSIM of one frame against a stack of references
+
+    Frame maps broadcast over the reference axis, so the element-wise work
+    for all references happens in one vectorized expression. Returns an
+    (N, H, W, C) float32 map including the border that SSIM scores exclude.
+    """
+    n_pixels = win_size ** 2
+    cov_norm = n_pixels / (n_pixels - 1)
+    c1 = (0.01 * data_range) ** 2
+    c2 = (0.03 * data_range) ** 2
+
+    ux = frame.mean
+    uy = references.mean
+
+    # 2 * cov(x, y) + c2
+    covariance = _box(frame.values * references.values, win_size)
+    ux_uy = ux * uy
+    covariance -= ux_uy
+    covariance *= 2 * cov_norm
+    covariance += c2
+
+    # (2 * ux * uy + c1) * (2 * cov(x, y) + c2)
+    ux_uy *= 2
+    ux_uy += c1
+    ux_uy *= covariance
+
+    # (ux^2 + uy^2 + c1) * (vx + vy + c2)
+    denominator = uy * uy
+    denominator += ux * ux + c1
+    denominator *= references.variance + (frame.variance + c2)
+
+    ux_uy /= denominator
+    return ux_uy
+
+
+def ssim_from_statistics(
+    frame: SSIMStatistics,
+    references: SSIMStatistics,
+    win_size: int = 7,
+    data_range: float = 255.0,
+) -> np.ndarray:
+    """
+    Colour SSIM of one frame against a stack of references in a single pass
+
+    Scores are interchangeable with skimage's structural_similarity using its
+    default uniform 7x7 window, so `detection_threshold` keeps its meaning.
+    References with pixel weights average the map over their unmasked pixels.
+    """
+    if references.weights is not None:
+        return _masked_ssim(frame, references, win_size, data_range)
+    pad = (win_size - 1) // 2
+    similarity = ssim_map(frame, references, win_size, data_range)[:, pad:-pad, pad:-pad]
+    return similarity.reshape(similarity.shape[0], -1).mean(axis=1, dtype=np.float64)
+
+
+def _masked_ssim(
+    frame: SSIMStatistics, references: SSIMStatistics, win_size: int, data_range: float
+) -> np.ndarray:
+    """Weighted SSIM that skips the fully masked rows and columns around the scored area"""
+    pad = (win_size - 1) // 2
+    count = references.values.shape[0]
+    scored = np.zeros(references.weights.shape, dtype=np.float32)
+    scored[:, pad:-pad, pad:-pad] = references.weights[:, pad:-pad, pad:-pad]
+    rows = np.flatnonzero(scored.any(axis=(0, 2)))
+    cols = np.flatnonzero(scored.any(axis=(0, 1)))
+    if rows.size == 0:
+        return np.zeros(count)
+
+    # Scored pixels keep their whole window, so their SSIM values are unchanged
+    height, width = scored.shape[1:]
+    top, bottom = max(rows[0] - pad, 0), min(rows[-1] + pad + 1, height)
+    left, right = max(cols[0] - pad, 0), min(cols[-1] + pad + 1, width)
+    frame, references = (
+        SSIMStatistics(
+            *(None if array is None else array[:, top:bottom, left:right] for array in statistics)
+        )
+        for statistics in (frame, references)
+    )
+    similarity = ssim_map(frame, references, win_size, data_range)
+    weights = scored[:, top:bottom, left:right, np.newaxis]
+    similarity *= weights
+    totals = weights.reshape(count, -1).sum(axis=1, dtype=np.float64) * similarity.shape[3]
+    weighted = similarity.reshape(count, -1).sum(axis=1, dtype=np.float64)
+    return np.divide(weighted, totals, out=np.zeros(count), where=totals > 0)
+
@@ -0,0 +1,127 @@
+import logging
+import cv2
+import numpy as np
+from PIL import Image
+from typing import Dict, Optional, Tuple
+from models.reference_cache import roi_to_box
+from models.popup_geometry import popup_scale
+
+
+class TemplateMatcher:
+    """Position- and scale-tolerant matching of cropped popup templates
+
+    Each reference is cropped to its popup region and matched over the frame
+    with normalized cross-correlation at a small set of scales. Dota's UI
+    scales with the window height, so the nominal template scale is the ratio
+    between the client height and the height the reference was captured at.
+    """
+
+    def __init__(
+        self,
+        reference_cache,
+        working_height: int = 360,
+        scale_factors: Tuple[float, ...] = (0.5, 0.56, 0.62, 0.69, 0.77, 0.86, 0.93, 1.0, 1.08),
+    ):
+        self.logger = logging.getLogger("Dota2AutoAccept.TemplateMatcher")
+        self.reference_cache = reference_cache
+        self.working_height = working_height
+        self.scale_factors = scale_factors
+        self._templates: Dict[tuple, list] = {}
+
+    def _get_templates(
+        self, ref_path: str, roi, frame_size: Tuple[int, int], client=None
+    ) -> list:
+        """
+        Grayscale templates of the popup region at every scale for this frame size
+        `client` is the (width, height) of the game's client area, the frame when None
+        """
+        client = tuple(client) if client is not None else tuple(frame_size)
+        key = (ref_path, roi, tuple(frame_size), client)
+        templates = self._templates.get(key)
+        if templates is not None:
+            return templates
+
+        templates = []
+        reference = self.reference_cache.get_decoded(ref_path)
+        if reference is None:
+            return templates
+        reference_size = reference.size
+        if roi is not None:
+            reference = reference.crop(roi_to_box(roi, reference.size))
+        gray = np.asarray(reference.convert("L"))
+
+        frame_width, frame_height = frame_size
+        work_scale = min(1.0, self.working_height / frame_height)
+        nominal = popup_scale(reference_size, client) * work_scale
+        max_width = int(frame_width * work_scale)
+        max_height = int(frame_height * work_scale)
+        for factor in self.scale_factors:
+            scale = nominal * factor
+            width = int(round(gray.shape[1] * scale))
+            height = int(round(gray.shape[0] * scale))
+            if width < 8 or height < 8 or width > max_width or height > max_height:
+                continue
+            template = cv2.resize(gray, (width, height), interpolation=cv2.INTER_AREA)
+            templates.append((scale, template))
+
+        if len(self._templates) > 64:
+            self._templates.clear()
+        self._templates[key] = templates
+        return templates
+
+    def template_extent(
+        self, ref_path: str, roi, frame_size: Tuple[int, int], client=None
+    ) -> Tuple[int, int]:
+        """(width, height) of the reference's largest template in working pixels"""
+        templates = self._get_templates(ref_path, roi, frame_size, client)
+        return (
+            max((template.shape[1] for _, template in templates), default=0),
+            max((template.shape[0] for _, template in templates), default=0),
+        )
+
+    def prepare_frame(self, img: Image.Image) -> Tuple[np.ndarray, float]:
+        """Downsample the frame to the working resolution in grayscale"""
+        gray = np.asarray(img.convert("L"))
+        work_scale = min(1.0, self.working_height / img.height)
+        if work_scale < 1.0:
+            gray = cv2.resize(
+                gray,
+                (int(img.width * work_scale), int(img.height * work_scale)),
+                interpolation=cv2.INTER_AREA,
+            )
+        return gray, work_scale
+
+    def match(
+        self,
+        frame: np.ndarray,
+        work_scale: float,
+        frame_size: Tuple[int, int],
+        ref_path: str,
+        roi=None,
+        client=None,
+    ) -> Tuple[float, Optional[Tuple[int, int, int, int]]]:
+        """
+        Match one reference against a prepared frame
+        Returns (score, (x, y, width, height)) with the location in frame pixels
+        """
+        best_score = 0.0
+        best_location = None
+        for _, template in self._get_templates(ref_path, roi, frame_size, client):
+            # The frame may be a narrowed search region smaller than the template
+            if template.shape[0] > frame.shape[0] or template.shape[1] > frame.shape[1]:
+                continue
+            result = cv2.matchTemplate(frame, template, cv2.TM_CCOEFF_NORMED)
+            _, score, _, location = cv2.minMaxLoc(result)
+            if score > best_score:
+                best_score = float(score)
+                best_location = (
+                    int(location[0] / work_scale),
+                    int(location[1] / work_scale),
+                    int(template.shape[1] / work_scale),
+                    int(template.shape[0] / work_scale),
+                )
+        return best_score, best_location
+
+    def clear(self) -> None:
+        """Drop every prepared template"""
+        self._templates.clear()
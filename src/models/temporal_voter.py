@@ -0,0 +1,55 @@
+from collections import defaultdict, deque
+from typing import Callable, Dict, Set, Tuple
+
+
+class TemporalVoter:
+    """k-of-n confirmation with hysteresis over recent per-reference scores
+
+    A reference is confirmed once at least `required` of its last `window`
+    scores reached its threshold, and stays confirmed while its score keeps
+    above the threshold minus `release_margin`. A single noisy frame can
+    therefore neither trigger an action nor interrupt a confirmed one.
+    """
+
+    def __init__(self, window: int = 3, required: int = 2, release_margin: float = 0.05):
+        self.release_margin = release_margin
+        self.required = required
+        self.window = window
+        self._scores: Dict[str, deque] = defaultdict(lambda: deque(maxlen=self.window))
+        self._confirmed: Set[str] = set()
+
+    def configure(self, window: int, required: int, release_margin: float) -> None:
+        """Apply new voting parameters, keeping the most recent scores"""
+        self.required = max(1, min(required, window))
+        self.release_margin = release_margin
+        if window != self.window:
+            self.window = window
+            for name, scores in self._scores.items():
+                self._scores[name] = deque(scores, maxlen=window)
+
+    def update(
+        self, scores: Dict[str, float], threshold_for: Callable[[str], float]
+    ) -> Tuple[str, float]:
+        """
+        Add one tick of scores and return the confirmed reference
+        Returns (name, score), or ("none", highest score) when nothing is confirmed
+        """
+        for name in set(self._scores) | set(scores):
+            score = scores.get(name, 0.0)
+            threshold = threshold_for(name)
+            self._scores[name].append(score)
+            if name in self._confirmed:
+                if score < threshold - self.release_margin:
+                    self._confirmed.discard(name)
+            elif sum(s >= threshold for s in self._scores[name]) >= self.required:
+                self._confirmed.add(name)
+
+        if self._confirmed:
+            name = max(self._confirmed, key=lambda n: self._scores[n][-1])
+            return name, self._scores[name][-1]
+        return "none", max(scores.values(), default=0.0)
+
+    def reset(self) -> None:
+        """Forget every score and confirmation"""
+        self._scores.clear()
+        self._confirmed.clear()
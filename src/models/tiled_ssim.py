@@ -0,0 +1,162 @@
+import threading
+import numpy as np
+from typing import Dict, NamedTuple, Tuple
+from models.ssim_scorer import SSIMStatistics, compute_statistics, ssim_map
+
+
+class _TileState(NamedTuple):
+    references: SSIMStatistics
+    checksums: np.ndarray  # (rows, cols) uint32
+    sums: np.ndarray  # (N, rows, cols) float64 partial SSIM sums
+    totals: np.ndarray  # (N, rows, cols) weight of the scored pixels in each tile
+    scores: np.ndarray
+
+
+class TiledSSIMScorer:
+    """Incremental SSIM that only rescores tiles of the region that changed
+
+    The frame region is split into a fixed grid of tiles with a checksum per
+    tile. Each tile keeps the partial sum of its SSIM map per reference, so
+    on the next frame only tiles whose pixels changed (or whose neighbours
+    changed, since the 7x7 window reaches `win_size // 2` pixels past a tile)
+    are recomputed, on the tile plus that halo. Scores equal a full pass.
+    Tiles entirely covered by the references' ignore masks are never scored.
+    """
+
+    def __init__(self, tile_size: int = 32, win_size: int = 7, full_ratio: float = 0.5):
+        self.tile_size = tile_size
+        self.win_size = win_size
+        self.full_ratio = full_ratio  # Above this dirty fraction one full pass is cheaper
+        self._lock = threading.Lock()
+        self._states: Dict[tuple, _TileState] = {}
+        self._weights = {}
+
+    def _grid(self, height: int, width: int) -> Tuple[int, int]:
+        return -(-height // self.tile_size), -(-width // self.tile_size)
+
+    def _checksums(self, frame: np.ndarray) -> np.ndarray:
+        """Random-weighted pixel sum of every tile, wrapping in 32 bits"""
+        height, width, channels = frame.shape
+        rows, cols = self._grid(height, width)
+        size = self.tile_size
+        padded = (rows * size, cols * size, channels)
+        with self._lock:
+            weights = self._weights.get(padded)
+            if weights is None:
+                rng = np.random.default_rng(0x5EED)
+                weights = rng.integers(1, 2 ** 32, size=padded, dtype=np.uint32)
+                self._weights[padded] = weights
+        pixels = np.zeros(padded, dtype=np.uint32)
+        pixels[:height, :width] = frame
+        pixels *= weights
+        tiles = pixels.reshape(rows, size, cols, size, channels)
+        return tiles.sum(axis=(1, 3, 4), dtype=np.uint32)
+
+    def _per_tile(self, values: np.ndarray) -> np.ndarray:
+        """Sum an (N, H, W, C) map over each tile into (N, rows, cols)"""
+        count, height, width, channels = values.shape
+        rows, cols = self._grid(height, width)
+        size = self.tile_size
+        padded = np.zeros((count, rows * size, cols * size, channels), dtype=np.float32)
+        padded[:, :height, :width] = values
+        tiles = padded.reshape(count, rows, size, cols, size, channels)
+        return tiles.sum(axis=(2, 4, 5), dtype=np.float64)
+
+    def _scored_weights(self, references: SSIMStatistics) -> np.ndarray:
+        """(N, H, W, 1) weight of every pixel in the score, 0 on the border"""
+        pad = (self.win_size - 1) // 2
+        count, height, width = references.values.shape[:3]
+        if references.weights is None:
+            weights = np.ones((count, height, width, 1), dtype=np.float32)
+        else:
+            weights = references.weights[..., np.newaxis].copy()
+        # The border excluded from SSIM scores contributes nothing
+        weights[:, :pad] = 0
+        weights[:, -pad:] = 0
+        weights[:, :, :pad] = 0
+        weights[:, :, -pad:] = 0
+        return weights
+
+    def _full_sums(self, frame: np.ndarray, references: SSIMStatistics) -> np.ndarray:
+        """Per-tile SSIM sums from one pass over the whole region"""
+        similarity = ssim_map(compute_statistics(frame, self.win_size), references, self.win_size)
+        similarity *= self._scored_weights(references)
+        return self._per_tile(similarity)
+
+    def _tile_sums(
+        self, frame: np.ndarray, references: SSIMStatistics, row: int, col: int
+    ) -> np.ndarray:
+        """SSIM sums of one tile, computed on the tile plus its window halo"""
+        pad = (self.win_size - 1) // 2
+        height, width = frame.shape[:2]
+        size = self.tile_size
+        top, left = row * size, col * size
+        bottom, right = min(top + size, height), min(left + size, width)
+        # Pixels inside the scored area, i.e. away from the region border
+        inner_top, inner_bottom = max(top, pad), min(bottom, height - pad)
+        inner_left, inner_right = max(left, pad), min(right, width - pad)
+        if inner_top >= inner_bottom or inner_left >= inner_right:
+            return np.zeros(references.values.shape[0])
+
+        y0, y1 = max(top - pad, 0), min(bottom + pad, height)
+        x0, x1 = max(left - pad, 0), min(right + pad, width)
+        window = SSIMStatistics(
+            *(None if array is None else array[:, y0:y1, x0:x1] for array in references)
+        )
+        similarity = ssim_map(
+            compute_statistics(frame[y0:y1, x0:x1], self.win_size), window, self.win_size
+        )
+        similarity = similarity[
+            :, inner_top - y0 : inner_bottom - y0, inner_left - x0 : inner_right - x0
+        ]
+        if references.weights is not None:
+            similarity *= references.weights[
+                :, inner_top:inner_bottom, inner_left:inner_right, np.newaxis
+            ]
+        return similarity.reshape(similarity.shape[0], -1).sum(axis=1, dtype=np.float64)
+
+    def score(self, key, frame: np.ndarray, references: SSIMStatistics) -> np.ndarray:
+        """SSIM of an (H, W, C) frame region against a reference stack, reusing clean tiles"""
+        height, width, channels = frame.shape
+        checksums = self._checksums(frame)
+        state = self._states.get(key)
+
+        if (
+            state is None
+            or state.references is not references
+            or state.checksums.shape != checksums.shape
+        ):
+            totals = self._per_tile(self._scored_weights(references)) * channels
+            sums = self._full_sums(frame, references)
+        else:
+            totals = state.totals
+            changed = checksums != state.checksums
+            if not changed.any():
+                return state.scores
+            # A changed tile also invalidates the halo of its neighbours
+            dirty = changed.copy()
+            dirty[1:] |= changed[:-1]
+            dirty[:-1] |= changed[1:]
+            dirty[:, 1:] |= dirty[:, :-1].copy()
+            dirty[:, :-1] |= dirty[:, 1:].copy()
+            # Tiles whose pixels are all ignored are never computed
+            dirty &= totals.sum(axis=0) > 0
+            if dirty.mean() > self.full_ratio:
+                sums = self._full_sums(frame, references)
+            else:
+                sums = state.sums.copy()
+                for row, col in np.argwhere(dirty):
+                    sums[:, row, col] = self._tile_sums(frame, references, row, col)
+
+        count = sums.shape[0]
+        total = totals.reshape(count, -1).sum(axis=1)
+        weighted = sums.reshape(count, -1).sum(axis=1)
+        scores = np.divide(weighted, total, out=np.zeros(count), where=total > 0)
+        self._states[key] = _TileState(references, checksums, sums, totals, scores)
+        return scores
+
+    def clear(self) -> None:
+        """Forget every region's tiles"""
+        with self._lock:
+            self._states.clear()
+            self._weights.clear()
@@ -37,6 +37,10 @@ class WindowModel:
         self.SWP_NOSIZE = 0x0001
         self.SWP_NOMOVE = 0x0002
 
+        # Client rectangle lookups are cached briefly; detection asks every tick
+        self._client_rect = None
+        self._client_rect_time = 0.0
+
     def get_dota2_processes(self) -> List[dict]:
         """Get all Dota 2 related processes"""
         dota_processes = []
@@ -477,6 +481,46 @@ class WindowModel:
 
         return success
 
+    def get_dota2_client_rect(self, max_age: float = 1.0) -> Optional[Tuple[int, int, int, int]]:
+        """
+        Screen (left, top, right, bottom) of the Dota 2 client area
+        Returns None when no visible Dota 2 window is found
+        """
+        if platform.system() != "Windows":
+            return None
+        now = time.monotonic()
+        if now - self._client_rect_time < max_age:
+            return self._client_rect
+
+        rect = None
+        windows = [w for w in self.get_dota2_windows() if w["is_visible"] and not w["is_minimized"]]
+        # The game's own window first, before browsers or tools titled "dota"
+        windows.sort(key=lambda w: not w["process_name"].lower().startswith("dota2"))
+        for window in windows:
+            hwnd = window["hwnd"]
+            try:
+                # Client area only, without the title bar and borders of a windowed client
+                _, _, width, height = win32gui.GetClientRect(hwnd)
+                left, top = win32gui.ClientToScreen(hwnd, (0, 0))
+                rect = (left, top, left + width, top + height)
+            except Exception:
+                rect = self.get_window_info(hwnd).get("rect")
+            if rect and rect[2] > rect[0] and rect[3] > rect[1]:
+                break
+            rect = None
+
+        self._client_rect = rect
+        self._client_rect_time = now
+        return rect
+
+    def get_debug_info(self) -> dict:
+        """Get debugging information about Dota 2 windows"""
+        return {
+            "processes": self.get_dota2_processes(),
+            "windows": self.get_dota2_windows(),
+            "all_related": self.list_all_dota2_related_windows(),
+        }
+
     def get_window_info(self, hwnd: int) -> dict:
         """Get detailed information about a window"""
         try:
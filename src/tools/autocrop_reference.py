@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Reference auto-cropper - finds the region of a reference screenshot that
+distinguishes the popup from "no popup" screenshots of the same scene and
+writes a tight crop plus its normalized (x, y, width, height) ROI.
+
+    python src/tools/autocrop_reference.py src/bin/dota.png empty1.png empty2.png \\
+        --name dota --write-manifest
+"""
+
+import sys
+import os
+import re
+import json
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cv2
+import numpy as np
+from PIL import Image
+from models.reference_manifest import MANIFEST_FILE
+from utils import get_resource_path
+
+
+def distinguishing_mask(reference: np.ndarray, negatives, threshold: int) -> np.ndarray:
+    """Pixels that differ from every negative screenshot by more than `threshold`"""
+    difference = None
+    for negative in negatives:
+        # Largest channel difference, blurred so single noisy pixels do not count
+        delta = cv2.absdiff(reference, negative).max(axis=2)
+        delta = cv2.GaussianBlur(delta, (5, 5), 0)
+        difference = delta if difference is None else np.minimum(difference, delta)
+    mask = (difference > threshold).astype(np.uint8)
+    # Join the popup's text and borders into one solid block
+    kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (15, 15))
+    return cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel)
+
+
+def largest_region(mask: np.ndarray, padding: int):
+    """Bounding box (left, top, right, bottom) of the largest connected region"""
+    count, _, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=8)
+    if count <= 1:
+        return None
+    label = 1 + int(np.argmax(stats[1:, cv2.CC_STAT_AREA]))
+    x, y, w, h = stats[label, :4]
+    height, width = mask.shape
+    return (
+        max(int(x) - padding, 0),
+        max(int(y) - padding, 0),
+        min(int(x + w) + padding, width),
+        min(int(y + h) + padding, height),
+    )
+
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_DECODER = json.JSONDecoder()
+
+
+def _member_spans(text: str, index: int):
+    """
+    (start, end) text spans of the members of the JSON object or array at text[index]
+    Returns {key: span} for an object and [span, ...] for an array
+    """
+    is_object = text[index] == "{"
+    closing = "}" if is_object else "]"
+    spans = {} if is_object else []
+    index = _WHITESPACE.match(text, index + 1).end()
+    while text[index] != closing:
+        if is_object:
+            key, index = json.decoder.scanstring(text, index + 1)
+            index = _WHITESPACE.match(text, index).end() + 1  # Past the colon
+            index = _WHITESPACE.match(text, index).end()
+        _, end = _DECODER.raw_decode(text, index)
+        if is_object:
+            spans[key] = (index, end)
+        else:
+            spans.append((index, end))
+        index = _WHITESPACE.match(text, end).end()
+        if text[index] == ",":
+            index = _WHITESPACE.match(text, index + 1).end()
+    return spans
+
+
+def update_manifest(name: str, roi) -> bool:
+    """Store the ROI on the named entry of bin/references.json
+
+    Only the text of that entry's own "roi" array is replaced, so the
+    hand-kept layout of the rest of the manifest is left as it is.
+    """
+    manifest_path = os.path.join(get_resource_path("bin"), MANIFEST_FILE)
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        text = f.read()
+    value = json.dumps([round(value, 4) for value in roi])
+
+    root = _member_spans(text, _WHITESPACE.match(text).end())
+    if "references" not in root:
+        return False
+    for start, _ in _member_spans(text, root["references"][0]):
+        entry = _member_spans(text, start)
+        if "name" not in entry or json.loads(text[slice(*entry["name"])]) != name:
+            continue
+        if "roi" in entry:
+            # Only the entry's own roi; signature and ocr blocks keep theirs
+            begin, end = entry["roi"]
+            text = text[:begin] + value + text[end:]
+        else:
+            # New key on its own line after "image", indented like it
+            anchor = entry.get("image", entry["name"])
+            line = text[text.rfind("\n", 0, anchor[0]) + 1 : anchor[0]]
+            indent = line[: len(line) - len(line.lstrip())]
+            text = f'{text[:anchor[1]]},\n{indent}"roi": {value}{text[anchor[1]:]}'
+        with open(manifest_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        return True
+    return False
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("reference", help="Screenshot with the popup")
+    parser.add_argument("negatives", nargs="+", help="Screenshots of the same scene without it")
+    parser.add_argument("--threshold", type=int, default=24, help="Per-pixel difference (0-255)")
+    parser.add_argument("--padding", type=int, default=6, help="Pixels added around the region")
+    parser.add_argument("--output", help="Crop image path (default: <reference>_crop.png)")
+    parser.add_argument("--name", help="Manifest entry the ROI belongs to")
+    parser.add_argument(
+        "--write-manifest", action="store_true", help="Save the ROI into bin/references.json"
+    )
+    args = parser.parse_args()
+
+    with Image.open(args.reference) as img:
+        reference_image = img.convert("RGB")
+    reference = np.asarray(reference_image)
+    negatives = []
+    for path in args.negatives:
+        with Image.open(path) as img:
+            negatives.append(
+                np.asarray(img.convert("RGB").resize(reference_image.size, Image.Resampling.LANCZOS))
+            )
+
+    box = largest_region(distinguishing_mask(reference, negatives, args.threshold), args.padding)
+    if box is None:
+        print("❌ The reference does not differ from the negatives; try a lower --threshold")
+        sys.exit(1)
+
+    width, height = reference_image.size
+    left, top, right, bottom = box
+    roi = (left / width, top / height, (right - left) / width, (bottom - top) / height)
+    output = args.output or os.path.splitext(args.reference)[0] + "_crop.png"
+    reference_image.crop(box).save(output)
+
+    area = (right - left) * (bottom - top) / (width * height)
+    print(f"✂️ Crop {right - left}x{bottom - top} px ({area:.1%} of the frame) written to {output}")
+    print(f"📐 roi: [{roi[0]:.4f}, {roi[1]:.4f}, {roi[2]:.4f}, {roi[3]:.4f}]")
+
+    if args.write_manifest:
+        if not args.name:
+            print("❌ --write-manifest needs --name")
+            sys.exit(1)
+        if not update_manifest(args.name, roi):
+            print(f"❌ No manifest entry named {args.name!r}")
+            sys.exit(1)
+        print(f"✅ Updated the roi of {args.name!r} in {MANIFEST_FILE}")
+
+
+if __name__ == "__main__":
+    main()
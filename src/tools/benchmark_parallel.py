@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Parallel scoring benchmark - wall-clock detection latency per tick,
+serial path vs the thread-pool path at several pool sizes.
+Run it on each machine of interest (e.g. 4, 8 and 16 cores).
+
+By default every reference is scored on every tick, so the pool always has
+work; --prefiltered keeps the app's cascade, which usually leaves one job.
+"""
+
+import sys
+import os
+import time
+import argparse
+import tempfile
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image
+from models.config_model import ConfigModel
+from models.detection_model import DetectionModel
+
+RESOLUTIONS = {
+    "1080p": (1920, 1080),
+    "1440p": (2560, 1440),
+    "2160p": (3840, 2160),
+}
+
+
+def make_config(args, parallel: bool, workers: int) -> ConfigModel:
+    """Throwaway configuration that never touches the user's config.json"""
+    config_path = os.path.join(tempfile.mkdtemp(), "benchmark_config.json")
+    config = ConfigModel(config_file=config_path)
+    config.detection_engine = args.engine
+    config.parallel_scoring_enabled = parallel
+    config.parallel_workers = workers
+    if not args.prefiltered:
+        # Score every reference at full resolution on every tick
+        config.frame_gate_enabled = False
+        config.color_signature_enabled = False
+        config.detection_pyramid_enabled = False
+        config.phash_prefilter_enabled = False
+        config.dirty_tiles_enabled = False
+        config.early_exit_enabled = False
+    return config
+
+
+def time_ticks(detection_model: DetectionModel, frames, ticks: int) -> float:
+    """Median seconds per detection tick over the given frames"""
+    for frame in frames:
+        detection_model.detect_match_in_image_with_score(frame)  # Warm caches
+    samples = []
+    for i in range(ticks):
+        frame = frames[i % len(frames)]
+        start = time.perf_counter()
+        detection_model.detect_match_in_image_with_score(frame)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, nargs="*", default=[4, 8, 16])
+    parser.add_argument("--ticks", type=int, default=20)
+    parser.add_argument("--engine", default="ssim", choices=["ssim", "chamfer", "classifier", "template", "fft"])
+    parser.add_argument(
+        "--resolutions", nargs="*", default=list(RESOLUTIONS), choices=list(RESOLUTIONS)
+    )
+    parser.add_argument(
+        "--prefiltered",
+        action="store_true",
+        help="Keep the frame gate, prefilters, dirty tiles and early exit of the app",
+    )
+    args = parser.parse_args()
+
+    print(f"🖥️ CPU cores: {os.cpu_count()}  engine: {args.engine}  prefiltered: {args.prefiltered}")
+    print(f"{'resolution':<12}{'mode':<14}{'ms/tick':>10}{'speedup':>10}")
+
+    for resolution in args.resolutions:
+        size = RESOLUTIONS[resolution]
+        serial_model = DetectionModel(config_model=make_config(args, False, 1))
+        frames = [
+            Image.open(path).convert("RGB").resize(size)
+            for path in serial_model.reference_images.values()
+            if os.path.exists(path)
+        ]
+
+        if resolution == args.resolutions[0]:
+            references = len(serial_model.reference_images)
+            print(
+                f"ℹ️ Scoring jobs are one per reference region, so pools are capped at "
+                f"{references} workers; larger pools repeat the {references}-worker result"
+            )
+
+        serial = time_ticks(serial_model, frames, args.ticks)
+        print(f"{resolution:<12}{'serial':<14}{serial * 1000:>10.1f}{1.0:>10.2f}")
+        serial_model.print_cascade_statistics()
+
+        for workers in args.workers:
+            model = DetectionModel(config_model=make_config(args, True, workers))
+            parallel = time_ticks(model, frames, args.ticks)
+            # The pool is bounded by the number of references
+            mode = f"pool {workers}->{model._scoring_pool_size}"
+            model.shutdown_scoring_pool()
+            print(
+                f"{resolution:<12}{mode:<14}{parallel * 1000:>10.1f}{serial / parallel:>10.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Build the precompiled reference pack into src/bin so bundled builds ship it.
+The app rebuilds its own copy automatically when a reference image changes.
+"""
+
+import sys
+import os
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.config_model import ConfigModel
+from models.reference_cache import ReferenceCache
+from models.reference_manifest import load_reference_manifest
+from models.reference_pack import PACK_FILE, PACK_RESOLUTIONS, build_reference_pack
+from utils import get_resource_path
+
+
+def main():
+    bin_dir = get_resource_path("bin")
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--output", default=os.path.join(bin_dir, PACK_FILE))
+    # Same coarse level the app's configuration uses
+    parser.add_argument(
+        "--pyramid-scale", type=float, default=ConfigModel().detection_pyramid_scale
+    )
+    args = parser.parse_args()
+
+    references = load_reference_manifest(bin_dir)
+    start = time.perf_counter()
+    if not build_reference_pack(
+        args.output,
+        references,
+        ReferenceCache(),
+        scales=(1.0, args.pyramid_scale),
+        statistics_scales=(args.pyramid_scale,),
+    ):
+        print(f"❌ Could not write {args.output}")
+        sys.exit(1)
+    resolutions = ", ".join(f"{w}x{h}" for w, h in PACK_RESOLUTIONS)
+    print(
+        f"✅ {len(references)} references packed at {resolutions} into {args.output} "
+        f"({os.path.getsize(args.output) / 1e6:.1f} MB, {time.perf_counter() - start:.2f}s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+SSIM parity check - compares the fast SSIM scorer with skimage
+on the shipped bin/ references
+"""
+
+import sys
+import os
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from PIL import Image
+from skimage.metrics import structural_similarity as ssim
+from models.reference_cache import ReferenceCache, roi_to_box
+from models.ssim_scorer import compute_statistics, ssim_from_statistics
+from models.detection_model import DetectionModel
+
+
+def check_parity(frame_size, tolerance: float) -> bool:
+    """Score every reference as a frame against every reference region"""
+    detection_model = DetectionModel()
+    cache = ReferenceCache()
+    worst = 0.0
+    ok = True
+
+    print(f"📐 Frame size {frame_size[0]}x{frame_size[1]}")
+    for frame_name, frame_path in detection_model.reference_images.items():
+        if not os.path.exists(frame_path):
+            continue
+        frame = Image.open(frame_path).convert("RGB").resize(frame_size, Image.Resampling.LANCZOS)
+        for ref_name, ref_path in detection_model.reference_images.items():
+            roi = detection_model.reference_rois.get(ref_name)
+            crop = np.asarray(frame.crop(roi_to_box(roi, frame.size)) if roi else frame)
+            size = (crop.shape[1], crop.shape[0])
+            ref_np = cache.get_array(ref_path, size, "RGB", roi)
+            ref_stats = cache.get_statistics([ref_path], size, "RGB", roi)
+            if ref_np is None or ref_stats is None:
+                continue
+
+            expected = ssim(crop, ref_np, channel_axis=2)
+            actual = float(ssim_from_statistics(compute_statistics(crop), ref_stats)[0])
+            diff = abs(expected - actual)
+            worst = max(worst, diff)
+            status = "✅" if diff <= tolerance else "❌"
+            ok = ok and diff <= tolerance
+            print(
+                f"{status} {frame_name:>10} vs {ref_name:<10} "
+                f"skimage={expected:.6f} fast={actual:.6f} diff={diff:.2e}"
+            )
+
+    print(f"📊 Worst difference: {worst:.2e} (tolerance {tolerance:.0e})")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tolerance", type=float, default=1e-4)
+    parser.add_argument(
+        "--sizes",
+        nargs="*",
+        default=["1920x1080", "2560x1440"],
+        help="Frame sizes to check, as WIDTHxHEIGHT",
+    )
+    args = parser.parse_args()
+
+    ok = True
+    for size in args.sizes:
+        width, height = (int(value) for value in size.lower().split("x"))
+        ok = check_parity((width, height), args.tolerance) and ok
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
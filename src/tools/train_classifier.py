@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Popup classifier trainer - fits a softmax regression over downsampled
+screenshots and reports its accuracy on a held-out split.
+
+Screenshots are read from one sub-folder per label, named after the
+references in bin/references.json plus "none" for frames without a popup:
+
+    dataset/dota/*.png  dataset/read_check/*.png  dataset/none/*.png ...
+"""
+
+import sys
+import os
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from PIL import Image
+from models.popup_classifier import NONE_LABEL, PopupClassifier, frame_features
+from models.reference_manifest import load_reference_manifest
+from utils import get_config_save_path, get_resource_path
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+
+
+def load_dataset(dataset_dir: str, labels):
+    """Feature matrix and label indices of every screenshot in the dataset"""
+    features, targets = [], []
+    for index, label in enumerate(labels):
+        label_dir = os.path.join(dataset_dir, label)
+        if not os.path.isdir(label_dir):
+            print(f"⚠️ No screenshots for {label!r} ({label_dir} missing)")
+            continue
+        for file_name in sorted(os.listdir(label_dir)):
+            if not file_name.lower().endswith(IMAGE_EXTENSIONS):
+                continue
+            with Image.open(os.path.join(label_dir, file_name)) as img:
+                features.append(frame_features(img.convert("RGB")))
+            targets.append(index)
+    return np.array(features, dtype=np.float32), np.array(targets, dtype=np.int64)
+
+
+def split(targets, holdout: float, seed: int):
+    """Stratified train / held-out index split"""
+    rng = np.random.default_rng(seed)
+    train, test = [], []
+    for label in np.unique(targets):
+        indices = rng.permutation(np.flatnonzero(targets == label))
+        count = int(round(len(indices) * holdout))
+        if len(indices) > 1:
+            count = min(max(count, 1), len(indices) - 1)
+        test.extend(indices[:count])
+        train.extend(indices[count:])
+    return np.array(train), np.array(test)
+
+
+def fit_softmax(features, targets, classes: int, epochs: int, learning_rate: float, l2: float):
+    """Full-batch gradient descent on the L2-regularized cross-entropy"""
+    samples, dimensions = features.shape
+    weights = np.zeros((classes, dimensions), dtype=np.float64)
+    bias = np.zeros(classes, dtype=np.float64)
+    one_hot = np.eye(classes)[targets]
+    # Classes are weighted equally however many screenshots each has
+    counts = np.maximum(one_hot.sum(axis=0), 1)
+    sample_weights = (1.0 / counts)[targets] * samples / classes
+
+    for _ in range(epochs):
+        logits = features @ weights.T + bias
+        logits -= logits.max(axis=1, keepdims=True)
+        probabilities = np.exp(logits)
+        probabilities /= probabilities.sum(axis=1, keepdims=True)
+        error = (probabilities - one_hot) * sample_weights[:, None] / samples
+        weights -= learning_rate * (error.T @ features + l2 * weights)
+        bias -= learning_rate * error.sum(axis=0)
+    return weights, bias
+
+
+def report(classifier: PopupClassifier, features, targets) -> float:
+    """Print held-out accuracy and the confusion matrix; returns the accuracy"""
+    predictions = classifier.probabilities(features).argmax(axis=1)
+    accuracy = float(np.mean(predictions == targets))
+    labels = classifier.labels
+    print(f"🎯 Held-out accuracy: {accuracy:.3f} ({len(targets)} screenshots)")
+    print(f"{'actual / predicted':<20}" + "".join(f"{label[:10]:>11}" for label in labels))
+    for index, label in enumerate(labels):
+        row = [int(np.sum((targets == index) & (predictions == other))) for other in range(len(labels))]
+        print(f"{label:<20}" + "".join(f"{count:>11}" for count in row))
+    return accuracy
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("dataset", help="Folder with one sub-folder of screenshots per label")
+    parser.add_argument("--output", default=get_config_save_path("popup_classifier.npz"))
+    parser.add_argument("--holdout", type=float, default=0.2)
+    parser.add_argument("--epochs", type=int, default=500)
+    parser.add_argument("--learning-rate", type=float, default=0.5)
+    parser.add_argument("--l2", type=float, default=1e-3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    labels = list(load_reference_manifest(get_resource_path("bin"))) + [NONE_LABEL]
+    features, targets = load_dataset(args.dataset, labels)
+    if len(targets) == 0:
+        print("❌ No screenshots found")
+        sys.exit(1)
+    train, test = split(targets, args.holdout, args.seed)
+    print(f"📚 {len(train)} training and {len(test)} held-out screenshots, {len(labels)} labels")
+
+    mean = features[train].mean(axis=0)
+    scale = features[train].std(axis=0) + 1e-3
+    weights, bias = fit_softmax(
+        (features[train] - mean) / scale,
+        targets[train],
+        len(labels),
+        args.epochs,
+        args.learning_rate,
+        args.l2,
+    )
+    classifier = PopupClassifier(labels, weights, bias, mean, scale)
+    if len(test):
+        report(classifier, features[test], targets[test])
+    classifier.save(args.output)
+    print(f"✅ Model written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()